@@ -0,0 +1,34 @@
+import time
+
+
+def percentile(samples, percent):
+    """Перцентиль с линейной интерполяцией между соседними значениями."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (
+        position - lower
+    )
+
+
+def measure(func, repeat, warmup=3):
+    """Время выполнения func в секундах для каждого из repeat запусков."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summarize(samples):
+    """p50/p95/p99 в миллисекундах."""
+    return {
+        f'p{percent}': round(percentile(samples, percent) * 1000, 3)
+        for percent in (50, 95, 99)
+    }
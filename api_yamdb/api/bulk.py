@@ -0,0 +1,209 @@
+from django.conf import settings
+from django.db import connection, transaction
+from rest_framework import serializers
+from reviews.models import Category, Genre, GenreTitle, Title, VersionStamp
+from reviews.search import index_titles
+
+from .serializers import TitleSerializer
+
+CREATED = 'created'
+UPDATED = 'updated'
+INVALID = 'invalid'
+
+
+class BulkSlugSerializer(serializers.Serializer):
+    """Элемент пакета жанров или категорий, без запросов к базе."""
+
+    name = serializers.CharField(max_length=256)
+    slug = serializers.SlugField(max_length=50)
+
+
+class BulkTitleSerializer(serializers.Serializer):
+    """Элемент пакета произведений: связи передаются слагами."""
+
+    name = serializers.CharField(max_length=256)
+    year = serializers.IntegerField()
+    description = serializers.CharField(
+        required=False, allow_null=True, allow_blank=True
+    )
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
+
+    validate_year = TitleSerializer.validate_year
+
+
+def validate_items(items, serializer_class):
+    """Проверить элементы пакета, вернуть данные и заготовки ответов."""
+    if not isinstance(items, list):
+        raise serializers.ValidationError('Ожидается список объектов.')
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise serializers.ValidationError(
+            f'Не больше {settings.BULK_MAX_ITEMS} объектов за запрос.'
+        )
+    results, valid = [], []
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            results.append({'index': index})
+            valid.append((index, serializer.validated_data))
+        else:
+            results.append({'index': index, 'status': INVALID,
+                            'errors': serializer.errors})
+    return results, valid
+
+
+def reject(results, index, errors):
+    results[index].update(status=INVALID, errors=errors)
+
+
+def bulk_write_slugged(model, items, upsert=False):
+    """
+    Пакетная запись жанров или категорий.
+
+    Существующие слаги выбираются одним запросом; без upsert они
+    считаются ошибкой, с upsert у них обновляется название.
+    """
+    results, valid = validate_items(items, BulkSlugSerializer)
+    seen = set()
+    for index, data in valid:
+        if data['slug'] in seen:
+            reject(results, index, {'slug': ['Повтор слага в пакете.']})
+        seen.add(data['slug'])
+    valid = [(index, data) for index, data in valid
+             if 'status' not in results[index]]
+    with transaction.atomic():
+        existing = model.objects.in_bulk(
+            [data['slug'] for _, data in valid], field_name='slug'
+        )
+        to_create, to_update = [], []
+        for index, data in valid:
+            obj = existing.get(data['slug'])
+            if obj is None:
+                to_create.append((index, model(**data)))
+            elif upsert:
+                obj.name = data['name']
+                to_update.append((index, obj))
+            else:
+                reject(results, index,
+                       {'slug': ['Объект с таким слагом уже существует.']})
+        model.objects.bulk_create([obj for _, obj in to_create])
+        model.objects.bulk_update([obj for _, obj in to_update], ['name'])
+        created_ids = dict(model.objects.filter(
+            slug__in=[obj.slug for _, obj in to_create]
+        ).values_list('slug', 'id'))
+        for index, obj in to_create:
+            results[index].update(status=CREATED, id=created_ids[obj.slug],
+                                  slug=obj.slug)
+        for index, obj in to_update:
+            results[index].update(status=UPDATED, id=obj.pk, slug=obj.slug)
+        if to_create or to_update:
+            scope = 'genres' if model is Genre else 'categories'
+            VersionStamp.bump(scope)
+            if to_update:
+                VersionStamp.bump('titles')
+    return results
+
+
+def resolve_title_relations(results, valid):
+    """Слаги всех жанров и категорий пакета - двумя запросами."""
+    genres = dict(Genre.objects.filter(slug__in={
+        slug for _, data in valid for slug in data['genre']
+    }).values_list('slug', 'id'))
+    categories = dict(Category.objects.filter(slug__in={
+        data['category'] for _, data in valid
+    }).values_list('slug', 'id'))
+    resolved = []
+    for index, data in valid:
+        errors = {}
+        unknown = sorted(set(data['genre']) - set(genres))
+        if unknown:
+            errors['genre'] = [f'Нет жанров: {", ".join(unknown)}.']
+        if data['category'] not in categories:
+            errors['category'] = ['Нет такой категории.']
+        if errors:
+            reject(results, index, errors)
+            continue
+        data['genre'] = sorted({genres[slug] for slug in data['genre']})
+        data['category_id'] = categories[data.pop('category')]
+        resolved.append((index, data))
+    return resolved
+
+
+def create_titles(titles):
+    """
+    Вставить произведения и вернуть те, что ещё не проиндексированы.
+
+    Без RETURNING (SQLite) bulk_create не проставляет id, поэтому
+    произведения сохраняются построчно, а индекс обновляет сигнал.
+    """
+    if connection.features.can_return_ids_from_bulk_insert:
+        Title.objects.bulk_create(titles)
+        return titles
+    for title in titles:
+        title.save()
+    return []
+
+
+def bulk_write_titles(items, upsert=False):
+    """
+    Пакетная запись произведений в одной транзакции.
+
+    С upsert произведение с тем же (name, year) обновляется,
+    его жанры заменяются переданными; повтор ключа в пакете - ошибка.
+    """
+    results, valid = validate_items(items, BulkTitleSerializer)
+    if upsert:
+        seen = set()
+        for index, data in valid:
+            key = (data['name'], data['year'])
+            if key in seen:
+                reject(results, index, {'non_field_errors': [
+                    'Повтор названия и года в пакете.'
+                ]})
+            seen.add(key)
+        valid = [(index, data) for index, data in valid
+                 if 'status' not in results[index]]
+    with transaction.atomic():
+        valid = resolve_title_relations(results, valid)
+        existing = {}
+        if upsert and valid:
+            existing = {
+                (title.name, title.year): title
+                for title in Title.objects.filter(
+                    name__in={data['name'] for _, data in valid},
+                    year__in={data['year'] for _, data in valid},
+                )
+            }
+        to_create, to_update, genres = [], [], {}
+        for index, data in valid:
+            genre_ids = data.pop('genre')
+            title = existing.get((data['name'], data['year']))
+            if title is None:
+                title = Title(**data)
+                to_create.append((index, title))
+            else:
+                title.description = data.get('description')
+                title.category_id = data['category_id']
+                to_update.append((index, title))
+            genres[index] = genre_ids
+        unindexed = create_titles([title for _, title in to_create])
+        Title.objects.bulk_update(
+            [title for _, title in to_update], ['description', 'category']
+        )
+        GenreTitle.objects.filter(
+            title__in=[title for _, title in to_update]
+        ).delete()
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title_id=title.pk, genre_id=genre_id)
+            for index, title in to_create + to_update
+            for genre_id in genres[index]
+        )
+        for status, pairs in ((CREATED, to_create), (UPDATED, to_update)):
+            for index, title in pairs:
+                results[index].update(status=status, id=title.pk)
+        if to_create or to_update:
+            index_titles(unindexed + [title for _, title in to_update])
+            VersionStamp.bump(
+                'titles', *[title.pk for _, title in to_update]
+            )
+    return results
@@ -0,0 +1,83 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+from api_yamdb.metrics import registry
+
+DEFAULT_SETTINGS = {
+    'CACHE_ALIAS': 'default',
+    'DEFAULT_TIMEOUT': 60,
+    'TIMEOUTS': {},
+}
+STATS_METRIC = 'yamdb_response_cache_{event}_total'
+
+
+def get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'RESPONSE_CACHE', {})}
+
+
+def get_cache():
+    return caches[get_settings()['CACHE_ALIAS']]
+
+
+def get_timeout(scope):
+    options = get_settings()
+    return options['TIMEOUTS'].get(scope, options['DEFAULT_TIMEOUT'])
+
+
+def normalize_query(query_params):
+    """Параметры запроса в каноническом виде: ключи и значения по порядку.
+
+    Пустые значения отбрасываются, поэтому `?genre=&year=2000`
+    и `?year=2000` попадают в одну запись кэша.
+    """
+    return '&'.join(
+        f'{key}={value}'
+        for key in sorted(query_params)
+        for value in sorted(query_params.getlist(key))
+        if value.strip()
+    )
+
+
+def make_key(scope, request, stamps):
+    """Ключ кэша: адрес сайта, путь, нормализованные параметры и версии.
+
+    Запись о версии данных в ключе делает инвалидацию адресной:
+    после записи в коллекцию старые ключи больше не запрашиваются
+    и вытесняются по LRU или TTL. Схема и хост входят в ключ,
+    потому что в ответах есть абсолютные ссылки пагинации.
+    """
+    source = '|'.join([
+        request.scheme,
+        request.get_host(),
+        request.path,
+        normalize_query(request.query_params),
+        request.accepted_media_type or '',
+        ','.join(str(version) for version, _ in stamps),
+    ])
+    digest = hashlib.md5(source.encode()).hexdigest()
+    return f'response-cache:{scope}:{digest}'
+
+
+def record(scope, event):
+    """
+    Учесть попадание (hits) или промах (misses).
+
+    Счётчики живут в реестре метрик процесса, а не в кэше ответов,
+    где их вытеснили бы сами ответы; у каждого воркера они свои.
+    """
+    registry.inc(STATS_METRIC.format(event=event), {'scope': scope})
+
+
+def get_stats(scopes):
+    """Попадания и промахи текущего воркера по коллекциям."""
+    return {
+        scope: {
+            event: int(registry.value(
+                STATS_METRIC.format(event=event), {'scope': scope}
+            ))
+            for event in ('hits', 'misses')
+        }
+        for scope in scopes
+    }
@@ -1,5 +1,50 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
 from django_filters.rest_framework import FilterSet, filters
-from reviews.models import Title
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+from reviews.models import Category, Genre, GenreTitle, Title
+from reviews.search import search_titles
+
+SLUG_CACHE_KEY = 'slug-id:{model}:{slug}'
+
+
+def slug_cache_key(model, slug):
+    return SLUG_CACHE_KEY.format(model=model._meta.label_lower, slug=slug)
+
+
+def resolve_slugs(model, slugs):
+    """
+    Id объектов по слагам: из кэша, недостающие - одним запросом.
+
+    Кэшируются только найденные слаги, поэтому новый жанр
+    или категория видны в фильтре сразу. Кэш общий для воркеров,
+    чтобы удаление слага в одном из них было видно всем.
+    """
+    cache = caches[settings.SLUG_CACHE_ALIAS]
+    keys = {slug_cache_key(model, slug): slug for slug in slugs}
+    cached = cache.get_many(list(keys))
+    missing = [slug for key, slug in keys.items() if key not in cached]
+    if missing:
+        found = dict(
+            model.objects.filter(slug__in=missing).values_list('slug', 'id')
+        )
+        cache.set_many(
+            {slug_cache_key(model, slug): pk for slug, pk in found.items()},
+            settings.SLUG_CACHE_TIMEOUT
+        )
+        cached.update(
+            {slug_cache_key(model, slug): pk for slug, pk in found.items()}
+        )
+    return list(cached.values())
+
+
+def forget_slug(model, slug):
+    caches[settings.SLUG_CACHE_ALIAS].delete(slug_cache_key(model, slug))
+
+
+def split_slugs(value):
+    return sorted({slug.strip() for slug in value.split(',') if slug.strip()})
 
 
 class TitlesFilter(FilterSet):
@@ -9,15 +54,58 @@ class TitlesFilter(FilterSet):
         field_name='name',
         lookup_expr='icontains'
     )
-    category = filters.CharFilter(
+    category = filters.CharFilter(method='filter_category')
+    genre = filters.CharFilter(method='filter_genre')
+    category_contains = filters.CharFilter(
         field_name='category__slug',
         lookup_expr='icontains'
     )
-    genre = filters.CharFilter(
+    genre_contains = filters.CharFilter(
         field_name='genre__slug',
-        lookup_expr='icontains'
+        lookup_expr='icontains',
+        distinct=True
     )
 
     class Meta:
         model = Title
         fields = ['name', 'year', 'genre', 'category']
+
+    def filter_category(self, queryset, name, value):
+        ids = resolve_slugs(Category, split_slugs(value))
+        return queryset.filter(category_id__in=ids)
+
+    def filter_genre(self, queryset, name, value):
+        """Произведения хотя бы с одним из жанров, без дублей."""
+        ids = resolve_slugs(Genre, split_slugs(value))
+        return queryset.filter(pk__in=GenreTitle.objects.filter(
+            genre_id__in=ids
+        ).values('title_id'))
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск по `?search=` с ранжированием результатов."""
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        return search_titles(queryset, query)
+
+
+class NullsLastOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter, у которого пустые значения всегда в конце.
+
+    У произведения без отзывов рейтинг NULL, и PostgreSQL при
+    `-rating` поставил бы такие произведения первыми.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        return queryset.order_by(*(
+            F(field[1:]).desc(nulls_last=True) if field.startswith('-')
+            else F(field).asc(nulls_last=True)
+            for field in ordering
+        ))
@@ -0,0 +1,71 @@
+import logging
+import sys
+from itertools import cycle, islice
+
+from api.benchmarks import measure, summarize
+from api.fast import FastReviewSerializer
+from api.renderers import FastJSONRenderer, use_orjson
+from django.core.management import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Review
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+logger = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stdout)
+stream_handler.setLevel(logging.INFO)
+stream_handler.setFormatter(
+    logging.Formatter(LOG_FORMAT)
+)
+
+
+logger.addHandler(stream_handler)
+logger.setLevel(logging.INFO)
+
+
+class Command(BaseCommand):
+    """Сравнение JSONRenderer DRF и FastJSONRenderer на страницах отзывов."""
+
+    help = 'Бенчмарк рендеринга страниц отзывов в JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-sizes', nargs='+', type=int, default=[10, 100, 1000],
+            help='Размеры страниц.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Сколько раз рендерить каждую страницу.'
+        )
+
+    def handle(self, *args, **options):
+        serializer = FastReviewSerializer()
+        reviews = serializer.serialize(serializer.get_rows(
+            Review.objects.order_by('-pub_date', '-id')
+        )[:max(options['page_sizes'])])
+        if not reviews:
+            raise CommandError(
+                'Нет отзывов: сначала загрузите данные командой load_data.'
+            )
+        if not use_orjson():
+            logger.warning('orjson не используется, сравнение без смысла.')
+        regular, fast = JSONRenderer(), FastJSONRenderer()
+        for size in options['page_sizes']:
+            page = {'count': size, 'next': None, 'previous': None,
+                    'results': list(islice(cycle(reviews), size))}
+            if regular.render(page) != fast.render(page):
+                raise CommandError(f'Страница {size}: ответы различаются.')
+            before = summarize(measure(
+                lambda: regular.render(page), options['repeat']
+            ))
+            after = summarize(measure(
+                lambda: fast.render(page), options['repeat']
+            ))
+            logger.info(
+                f'Страница {size}: JSONRenderer {self.format(before)}; '
+                f'FastJSONRenderer {self.format(after)}; '
+                f'ускорение p50 x{before["p50"] / after["p50"]:.1f}'
+            )
+
+    @staticmethod
+    def format(summary):
+        return ', '.join(f'{key} {value} мс' for key, value in summary.items())
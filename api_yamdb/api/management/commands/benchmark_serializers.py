@@ -0,0 +1,109 @@
+import logging
+import sys
+
+from api.benchmarks import measure, summarize
+from api.fast import (FastCommentSerializer, FastReviewSerializer,
+                      FastTitleSerializer)
+from api.serializers import (CommentSerializer, GetTitleSerializer,
+                             ReviewSerializer)
+from django.core.management import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Comment, Review, Title
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+logger = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stdout)
+stream_handler.setLevel(logging.INFO)
+stream_handler.setFormatter(
+    logging.Formatter(LOG_FORMAT)
+)
+
+
+logger.addHandler(stream_handler)
+logger.setLevel(logging.INFO)
+
+
+def get_targets():
+    """Querysets как во вьюсетах: произведения, отзывы и комментарии."""
+    title = Title.objects.annotate(
+        amount=Count('reviews')
+    ).order_by('-amount').first()
+    review = Review.objects.annotate(
+        amount=Count('comments')
+    ).order_by('-amount').first()
+    if title is None or review is None:
+        raise CommandError(
+            'Нет данных: сначала загрузите их командой load_data.'
+        )
+    return {
+        'titles': (
+            Title.objects.select_related('category').prefetch_related(
+                'genre'
+            ),
+            GetTitleSerializer, FastTitleSerializer
+        ),
+        'reviews': (
+            title.reviews.select_related('author'),
+            ReviewSerializer, FastReviewSerializer
+        ),
+        'comments': (
+            Comment.objects.filter(review=review).select_related('author'),
+            CommentSerializer, FastCommentSerializer
+        ),
+    }
+
+
+class Command(BaseCommand):
+    """Сравнение сериализаторов DRF и FastSerializer на страницах списка."""
+
+    help = 'Микробенчмарк сериализации страниц списков.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-sizes', nargs='+', type=int, default=[10, 50, 100],
+            help='Размеры страниц.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Сколько раз сериализовать каждую страницу.'
+        )
+        parser.add_argument(
+            '--targets', nargs='+', default=['titles', 'reviews', 'comments'],
+            choices=['titles', 'reviews', 'comments'],
+            help='Какие списки проверять.'
+        )
+
+    def handle(self, *args, **options):
+        targets = get_targets()
+        renderer = JSONRenderer()
+        for name in options['targets']:
+            queryset, serializer_class, fast_class = targets[name]
+            fast = fast_class()
+            for size in options['page_sizes']:
+
+                def regular():
+                    return renderer.render(serializer_class(
+                        list(queryset[:size]), many=True
+                    ).data)
+
+                def fast_path():
+                    return renderer.render(fast.serialize(
+                        fast.get_rows(queryset)[:size]
+                    ))
+
+                if regular() != fast_path():
+                    raise CommandError(
+                        f'{name}: ответы сериализаторов различаются.'
+                    )
+                slow = summarize(measure(regular, options['repeat']))
+                quick = summarize(measure(fast_path, options['repeat']))
+                logger.info(
+                    f'{name}, страница {size}: DRF {self.format(slow)}; '
+                    f'fast {self.format(quick)}; '
+                    f'ускорение p50 x{slow["p50"] / quick["p50"]:.1f}'
+                )
+
+    @staticmethod
+    def format(summary):
+        return ', '.join(f'{key} {value} мс' for key, value in summary.items())
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+from api.benchmarks import summarize
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from api_yamdb.asgi import get_asgi_application
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+logger = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stdout)
+stream_handler.setLevel(logging.INFO)
+stream_handler.setFormatter(
+    logging.Formatter(LOG_FORMAT)
+)
+
+
+logger.addHandler(stream_handler)
+logger.setLevel(logging.INFO)
+
+PATHS = ('/api/v1/titles/', '/api/v1/genres/', '/api/v1/categories/')
+HOST = 'localhost'
+
+
+class Command(BaseCommand):
+    """
+    Пропускная способность WSGI и ASGI при одновременных клиентах.
+
+    Оба режима выполняются в процессе. WSGI - это синхронные воркеры
+    gunicorn: пока медленный клиент передаёт запрос, воркер занят.
+    ASGI - цикл событий, который ждёт клиента без потока, и пул
+    ASGI_THREADS потоков для вьюх. `--client-delay` задаёт время
+    передачи запроса клиентом.
+    """
+
+    help = ('Бенчмарк WSGI и ASGI: задержки и запросы в секунду '
+            'при одновременных клиентах.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--clients', type=int, default=50,
+            help='Одновременных клиентов.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Синхронных воркеров WSGI.'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=settings.ASGI_THREADS,
+            help='Потоков ASGI.'
+        )
+        parser.add_argument(
+            '--client-delay', type=float, default=0,
+            help='Время передачи запроса клиентом, мс.'
+        )
+        parser.add_argument('--paths', nargs='+', default=list(PATHS))
+
+    def handle(self, *args, **options):
+        paths = list(islice(cycle(options['paths']), options['requests']))
+        delay = options['client_delay'] / 1000
+        wsgi = self.run_wsgi(
+            paths, options['clients'], options['workers'], delay
+        )
+        asgi = asyncio.run(self.run_asgi(
+            paths, options['clients'], options['threads'], delay
+        ))
+        for name, (statuses, latencies, elapsed) in (('wsgi', wsgi),
+                                                     ('asgi', asgi)):
+            errors = sum(1 for status in statuses if status >= 400)
+            if errors:
+                raise CommandError(f'{name}: {errors} ответов с ошибкой.')
+            logger.info('{}: {} rps, {}'.format(
+                name, round(len(paths) / elapsed, 1), summarize(latencies)
+            ))
+
+    @staticmethod
+    def run_wsgi(paths, clients, workers, delay):
+        application = WSGIHandler()
+        factory = RequestFactory(SERVER_NAME=HOST)
+        free_workers = threading.BoundedSemaphore(workers)
+
+        def call(path):
+            started = time.perf_counter()
+            with free_workers:
+                time.sleep(delay)
+                response = application(
+                    factory.get(path).environ, lambda status, headers: None
+                )
+                b''.join(response)
+                response.close()
+            return response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(clients) as executor:
+            results = list(executor.map(call, paths))
+        elapsed = time.perf_counter() - started
+        return [status for status, _ in results], [
+            latency for _, latency in results
+        ], elapsed
+
+    @staticmethod
+    async def run_asgi(paths, clients, threads, delay):
+        application = get_asgi_application(threads)
+        queue = asyncio.Queue()
+        for path in paths:
+            queue.put_nowait(path)
+        statuses, latencies = [], []
+
+        async def call(path):
+            started = time.perf_counter()
+            messages = []
+
+            async def receive():
+                await asyncio.sleep(delay)
+                return {'type': 'http.request', 'body': b'',
+                        'more_body': False}
+
+            async def send(message):
+                messages.append(message)
+
+            await application({
+                'type': 'http', 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': path, 'root_path': '',
+                'query_string': b'', 'headers': [(b'host', HOST.encode())],
+                'server': (HOST, 80),
+            }, receive, send)
+            statuses.append(messages[0]['status'])
+            latencies.append(time.perf_counter() - started)
+
+        async def client():
+            while not queue.empty():
+                await call(queue.get_nowait())
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+        application.executor.shutdown()
+        return statuses, latencies, elapsed
@@ -0,0 +1,258 @@
+import json
+import logging
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api.benchmarks import summarize
+from auths.models import ConfirmationCode
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+from reviews.models import Category, Genre, Review, Title
+from users.models import User
+
+from api_yamdb.metrics import QueryCounter
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+logger = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stdout)
+stream_handler.setLevel(logging.INFO)
+stream_handler.setFormatter(
+    logging.Formatter(LOG_FORMAT)
+)
+
+
+logger.addHandler(stream_handler)
+logger.setLevel(logging.INFO)
+
+SCENARIOS = ('titles_filtered', 'reviews_page', 'token', 'review_create')
+SYNTHETIC_DOMAIN = '@yamdb.fake'
+
+
+class Fixtures:
+    """
+    Данные для сценариев: выбираются заранее и в замеры не входят.
+
+    Берутся только синтетические пользователи из generate_dataset:
+    выпуск кода заменяет прежний, и настоящий пользователь
+    потерял бы код из письма.
+    """
+
+    def __init__(self, rng, requests, prefix):
+        self.rng = rng
+        self.users = list(User.objects.filter(
+            role=User.USER, is_active=True,
+            username__startswith=prefix, email__endswith=SYNTHETIC_DOMAIN
+        ).order_by('id')[:1000])
+        self.title_ids = list(Title.objects.order_by(
+            '-reviews_count'
+        ).values_list('id', flat=True)[:1000])
+        if not self.users or not self.title_ids:
+            raise CommandError('Нет данных: запустите generate_dataset.')
+        self.genres = list(Genre.objects.values_list('slug', flat=True))
+        self.categories = list(Category.objects.values_list('slug',
+                                                            flat=True))
+        self.codes = [
+            (user.username, ConfirmationCode.issue(user))
+            for user in rng.sample(self.users, min(requests, len(self.users)))
+        ]
+        self.review_pairs = self.free_pairs(requests)
+
+    def free_pairs(self, amount):
+        """Пары (пользователь, произведение) без отзыва - для создания."""
+        candidates = {
+            (self.rng.choice(self.users), self.rng.choice(self.title_ids))
+            for _ in range(amount * 3)
+        }
+        taken = set(Review.objects.filter(
+            author__in={user for user, _ in candidates},
+            title_id__in={title_id for _, title_id in candidates},
+        ).values_list('author_id', 'title_id'))
+        return [
+            (user, title_id) for user, title_id in candidates
+            if (user.pk, title_id) not in taken
+        ][:amount]
+
+    def popular_title(self):
+        """Популярные произведения запрашиваются чаще."""
+        rank = min(int(self.rng.paretovariate(1.2)), len(self.title_ids))
+        return self.title_ids[rank - 1]
+
+
+class Command(BaseCommand):
+    """Нагрузочный прогон горячих эндпоинтов внутри процесса."""
+
+    help = ('Нагрузочный тест: задержки, пропускная способность '
+            'и число SQL-запросов в JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Запросов на сценарий.'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=1,
+            help='Параллельных клиентов.'
+        )
+        parser.add_argument(
+            '--scenarios', nargs='+', choices=SCENARIOS,
+            default=list(SCENARIOS)
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix', default='load',
+            help='Префикс имён пользователей из generate_dataset.'
+        )
+        parser.add_argument(
+            '--output', default='loadtest.json',
+            help='Куда записать отчёт.'
+        )
+        parser.add_argument(
+            '--label', default='',
+            help='Метка прогона в отчёте, например хэш коммита.'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        fixtures = Fixtures(rng, options['requests'], options['prefix'])
+        report = {
+            'label': options['label'],
+            'started': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'requests': options['requests'],
+            'threads': options['threads'],
+            'dataset': {
+                'titles': Title.objects.count(),
+                'reviews': Review.objects.count(),
+                'users': User.objects.count(),
+            },
+            'scenarios': {},
+        }
+        try:
+            for name in options['scenarios']:
+                requests = list(getattr(self, f'plan_{name}')(
+                    fixtures, options['requests']
+                ))
+                logger.info(f'{name}: {len(requests)} запросов...')
+                report['scenarios'][name] = self.run(
+                    requests, options['threads']
+                )
+                logger.info(f'{name}: {report["scenarios"][name]}')
+        finally:
+            removed = self.cleanup(fixtures)
+            logger.info(f'Удалено созданных прогоном отзывов: {removed}')
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(report, output, ensure_ascii=False, indent=2,
+                      sort_keys=True)
+        logger.info(f'Отчёт записан в {options["output"]}')
+
+    @staticmethod
+    def plan_titles_filtered(fixtures, amount):
+        """Анонимно: AdminOrReadOnly не пускает обычных пользователей."""
+        rng = fixtures.rng
+        for _ in range(amount):
+            params = {}
+            if rng.random() < 0.3:
+                params['year'] = rng.randint(1950, 2025)
+            if fixtures.genres and rng.random() < 0.7:
+                params['genre'] = rng.choice(fixtures.genres)
+            if fixtures.categories and rng.random() < 0.5:
+                params['category'] = rng.choice(fixtures.categories)
+            yield 'get', '/api/v1/titles/', params, None
+
+    @staticmethod
+    def plan_reviews_page(fixtures, amount):
+        rng = fixtures.rng
+        for _ in range(amount):
+            title_id = fixtures.popular_title()
+            params = {'limit': 20, 'offset': rng.choice((0, 0, 0, 20, 40))}
+            yield ('get', f'/api/v1/titles/{title_id}/reviews/', params,
+                   rng.choice(fixtures.users))
+
+    @staticmethod
+    def plan_token(fixtures, amount):
+        for username, code in fixtures.codes[:amount]:
+            yield 'post', '/api/v1/auth/token/', {
+                'username': username, 'confirmation_code': code
+            }, None
+
+    @staticmethod
+    def plan_review_create(fixtures, amount):
+        rng = fixtures.rng
+        for user, title_id in fixtures.review_pairs[:amount]:
+            yield 'post', f'/api/v1/titles/{title_id}/reviews/', {
+                'text': 'Нагрузочный отзыв', 'score': rng.randint(1, 10)
+            }, user
+
+    @staticmethod
+    def cleanup(fixtures):
+        """
+        Удалить отзывы, созданные review_create, и выпущенные коды.
+
+        Отзывы удаляются через API от имени автора, чтобы счётчики
+        произведений и рейтинг вернулись к прежним значениям.
+        """
+        authors = {
+            (user.pk, title_id): user
+            for user, title_id in fixtures.review_pairs
+        }
+        created = Review.objects.filter(
+            author_id__in={author_id for author_id, _ in authors},
+            title_id__in={title_id for _, title_id in authors},
+        ).values_list('pk', 'author_id', 'title_id')
+        client = Client()
+        removed = 0
+        for pk, author_id, title_id in created:
+            user = authors.get((author_id, title_id))
+            if user is None:
+                continue
+            response = client.delete(
+                f'/api/v1/titles/{title_id}/reviews/{pk}/',
+                HTTP_AUTHORIZATION=f'Bearer {user.token}'
+            )
+            removed += response.status_code == 204
+        ConfirmationCode.objects.filter(
+            user__username__in=[username for username, _ in fixtures.codes]
+        ).delete()
+        return removed
+
+    def run(self, requests, threads):
+        started = time.perf_counter()
+        if threads > 1:
+            with ThreadPoolExecutor(threads) as executor:
+                results = list(executor.map(self.call, requests))
+        else:
+            results = [self.call(request) for request in requests]
+        elapsed = time.perf_counter() - started
+        if not results:
+            return {'count': 0}
+        latencies = [latency for latency, _, _ in results]
+        queries = [count for _, count, _ in results]
+        return {
+            **summarize(latencies),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+            'throughput_rps': round(len(results) / elapsed, 1),
+            'queries_mean': round(sum(queries) / len(queries), 2),
+            'queries_max': max(queries),
+            'errors': sum(1 for _, _, status in results if status >= 400),
+            'count': len(results),
+        }
+
+    @staticmethod
+    def call(request):
+        method, path, data, user = request
+        client = Client()
+        headers = {}
+        if user is not None:
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {user.token}'
+        counter = QueryCounter()
+        if method == 'post':
+            headers['content_type'] = 'application/json'
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            response = getattr(client, method)(path, data, **headers)
+            latency = time.perf_counter() - started
+        return latency, counter.count, response.status_code
@@ -1,6 +1,18 @@
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
 from django.http.response import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework import exceptions, mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from reviews.models import VersionStamp
+
+from . import cache, renderers
 
 
 class GetPostDeleteViewset(
@@ -63,3 +75,348 @@ class CustomHandlerModelViewSet(viewsets.ModelViewSet):
             {'detail': f'{exc}'},
             status=status.HTTP_403_FORBIDDEN
         )
+
+
+class NestedParentMixin:
+    """
+    Родительский объект вложенного маршрута, один запрос на HTTP-запрос.
+
+    `parent_lookups` сопоставляет поля модели `parent_model`
+    с аргументами URL. Вьюсет создаётся на каждый запрос, поэтому
+    кэш на экземпляре делит объект между get_queryset, контекстом
+    сериализатора и perform_*.
+    """
+
+    parent_model = None
+    parent_lookups = {}
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(self.parent_model, **{
+                field: self.kwargs.get(kwarg)
+                for field, kwarg in self.parent_lookups.items()
+            })
+        return self._parent
+
+
+class ExpandMixin:
+    """
+    Встраивание связанных данных в ответ по `?expand=`.
+
+    Значения перечисляются повторением параметра или через запятую;
+    допустимые - в `expandable`. Вьюсет дополняет запрос
+    в expand_queryset, а данные, которые выбираются по id страницы, -
+    в expand_objects; сериализатор получает набор из контекста.
+    Списки с expand строятся обычными сериализаторами DRF.
+    """
+
+    expand_query_param = 'expand'
+    expandable = ()
+
+    def get_expand(self):
+        if not hasattr(self, '_expand'):
+            requested = {
+                name.strip()
+                for value in self.request.query_params.getlist(
+                    self.expand_query_param
+                )
+                for name in value.split(',') if name.strip()
+            }
+            unknown = requested - set(self.expandable)
+            if unknown:
+                raise exceptions.ValidationError({
+                    self.expand_query_param: 'Неизвестные значения: {}. '
+                    'Допустимые: {}.'.format(
+                        ', '.join(sorted(unknown)),
+                        ', '.join(self.expandable) or '-'
+                    )
+                })
+            self._expand = frozenset(
+                requested if self.request.method == 'GET' else ()
+            )
+        return self._expand
+
+    def expand_queryset(self, queryset):
+        return queryset
+
+    def expand_objects(self, objects):
+        """Дополнить уже выбранные объекты страницы или один объект."""
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None and self.get_expand():
+            self.expand_objects(page)
+        return page
+
+    def get_object(self):
+        obj = super().get_object()
+        if self.get_expand():
+            self.expand_objects([obj])
+        return obj
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand'] = self.get_expand()
+        return context
+
+    def use_fast_serializer(self):
+        return not self.get_expand() and super().use_fast_serializer()
+
+
+class SparseFieldsMixin:
+    """
+    `?fields=name,year` - только перечисленные поля ответа.
+
+    `sparse_fields` сопоставляет поле ответа с колонками для only();
+    путь через `__` - колонка связанной модели, которая выбирается
+    через select_related. `sparse_prefetch` - prefetch_related,
+    нужный полю: без поля он не выполняется. Колонки из
+    `sparse_required` читаются всегда.
+    """
+
+    fields_query_param = 'fields'
+    sparse_fields = {}
+    sparse_prefetch = {}
+    sparse_required = ()
+
+    def get_sparse_fields(self):
+        """Запрошенные поля или None, если ограничения нет."""
+        if not hasattr(self, '_sparse_fields'):
+            requested = {
+                name.strip()
+                for value in self.request.query_params.getlist(
+                    self.fields_query_param
+                )
+                for name in value.split(',') if name.strip()
+            }
+            unknown = requested - set(self.sparse_fields)
+            if unknown:
+                raise exceptions.ValidationError({
+                    self.fields_query_param: 'Неизвестные поля: {}. '
+                    'Допустимые: {}.'.format(
+                        ', '.join(sorted(unknown)),
+                        ', '.join(self.sparse_fields)
+                    )
+                })
+            self._sparse_fields = None
+            if requested and self.request.method == 'GET':
+                self._sparse_fields = frozenset(requested)
+        return self._sparse_fields
+
+    def sparse_queryset(self, queryset):
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        columns = {queryset.model._meta.pk.name, *self.sparse_required}
+        related = set()
+        prefetch = []
+        for name in fields:
+            for path in self.sparse_fields[name]:
+                columns.add(path)
+                if '__' in path:
+                    related.add(path.rsplit('__', 1)[0])
+            if name in self.sparse_prefetch:
+                prefetch.append(self.sparse_prefetch[name])
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset.only(*columns, *related)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_fields()
+        return context
+
+    def get_fast_serializer(self, **kwargs):
+        kwargs.setdefault('fields', self.get_sparse_fields())
+        return super().get_fast_serializer(**kwargs)
+
+
+class FastReadMixin:
+    """
+    Список через FastSerializer вместо сериализатора DRF.
+
+    Включается настройкой FAST_SERIALIZATION; ответ совпадает
+    с обычным, меняется только способ его построения. Страницы от
+    JSON_RENDERER['STREAM_MIN_ITEMS'] элементов отдаются потоком.
+    """
+
+    fast_serializer_class = None
+
+    def use_fast_serializer(self):
+        return (settings.FAST_SERIALIZATION
+                and self.fast_serializer_class is not None)
+
+    def get_fast_serializer(self, **kwargs):
+        return self.fast_serializer_class(**kwargs)
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_serializer():
+            return super().list(request, *args, **kwargs)
+        serializer = self.get_fast_serializer()
+        rows = serializer.get_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            if self.use_streaming(request, page):
+                return self.get_streaming_response(request, serializer, page)
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
+
+    def use_streaming(self, request, page):
+        threshold = renderers.get_settings()['STREAM_MIN_ITEMS']
+        return (threshold and len(page) >= threshold
+                and isinstance(request.accepted_renderer, JSONRenderer))
+
+    def get_streaming_response(self, request, serializer, page):
+        size = renderers.get_settings()['STREAM_CHUNK_SIZE']
+        chunks = (
+            serializer.serialize(page[start:start + size])
+            for start in range(0, len(page), size)
+        )
+        return StreamingHttpResponse(
+            renderers.stream_json(
+                request.accepted_renderer,
+                self.get_paginated_response([]).data,
+                chunks
+            ),
+            content_type=request.accepted_renderer.media_type
+        )
+
+
+class ConditionalGetMixin:
+    """
+    ETag и Last-Modified для list и retrieve по версиям из VersionStamp.
+
+    Если клиент прислал актуальный If-None-Match или If-Modified-Since,
+    ответ 304 отдаётся без запроса данных и сериализации.
+    """
+
+    version_scope = None
+
+    def is_versioned(self, request):
+        """False, если ответ зависит от данных вне version_scope."""
+        return True
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_versioned(request):
+            return super().list(request, *args, **kwargs)
+        return self.conditional_response(
+            request, None, super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.is_versioned(request):
+            return super().retrieve(request, *args, **kwargs)
+        object_key = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        return self.conditional_response(
+            request, object_key, super().retrieve, *args, **kwargs
+        )
+
+    def conditional_response(self, request, object_key, handler,
+                             *args, **kwargs):
+        stamps = VersionStamp.lookup(self.version_scope, object_key)
+        etag = self.get_etag(request, object_key, stamps)
+        last_modified = None
+        if stamps:
+            last_modified = int(max(
+                modified for _, modified in stamps
+            ).timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.get_fresh_response(
+                request, stamps, handler, *args, **kwargs
+            )
+        if response.status_code in (status.HTTP_200_OK,
+                                    status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get_fresh_response(self, request, stamps, handler, *args, **kwargs):
+        return handler(request, *args, **kwargs)
+
+    def get_etag(self, request, object_key, stamps):
+        source = '|'.join([
+            self.version_scope,
+            str(object_key),
+            ','.join(str(version) for version, _ in stamps),
+            request.get_full_path(),
+            request.accepted_media_type or '',
+        ])
+        return 'W/"{}"'.format(hashlib.md5(source.encode()).hexdigest())
+
+
+class ResponseCacheMixin(ConditionalGetMixin):
+    """
+    Кэш готовых ответов на анонимные GET-запросы.
+
+    Версии из VersionStamp входят в ключ, поэтому запись в коллекцию
+    сразу делает её старые ответы недоступными.
+    """
+
+    def get_fresh_response(self, request, stamps, handler, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        scope = self.version_scope
+        key = cache.make_key(scope, request, stamps)
+        cached = cache.get_cache().get(key)
+        if cached is not None:
+            cache.record(scope, 'hits')
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+            response['X-Cache'] = 'HIT'
+            return response
+        cache.record(scope, 'misses')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            self.response_cache_key = key
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        key = getattr(self, 'response_cache_key', None)
+        if key is not None and isinstance(response, Response):
+            response['X-Cache'] = 'MISS'
+            response.add_post_render_callback(
+                lambda rendered: self.store_response(key, rendered)
+            )
+        return response
+
+    def store_response(self, key, response):
+        cache.get_cache().set(
+            key,
+            (response.content, response['Content-Type']),
+            cache.get_timeout(self.version_scope)
+        )
+
+
+class BulkWriteMixin:
+    """
+    `POST <коллекция>/bulk/` - пакетная запись списка объектов.
+
+    С `?upsert=true` существующие объекты обновляются по естественному
+    ключу. Ответ содержит результат для каждого элемента пакета.
+    """
+
+    def bulk_write(self, items, upsert):
+        raise NotImplementedError
+
+    @action(methods=['POST'], detail=False, url_path='bulk')
+    def bulk(self, request):
+        upsert = request.query_params.get('upsert', '').lower() in (
+            '1', 'true', 'yes'
+        )
+        results = self.bulk_write(request.data, upsert)
+        summary = {'created': 0, 'updated': 0, 'invalid': 0}
+        for result in results:
+            summary[result['status']] += 1
+        return Response(
+            {**summary, 'results': results}, status=status.HTTP_200_OK
+        )
@@ -0,0 +1,71 @@
+from rest_framework.pagination import (BasePagination, CursorPagination,
+                                       LimitOffsetPagination,
+                                       PageNumberPagination)
+
+
+class PubDateCursorPagination(CursorPagination):
+    """Курсорная пагинация по индексу (pub_date, id), без COUNT и OFFSET."""
+
+    ordering = ('-pub_date', '-id')
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+
+class OptionalCursorPagination(BasePagination):
+    """
+    Пагинация со старым offset-режимом по умолчанию.
+
+    Запрос с `?pagination=cursor` переключает на курсорный режим:
+    время выдачи страницы не зависит от глубины прокрутки,
+    ссылки next/previous сохраняют параметр режима.
+    """
+
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    offset_class = LimitOffsetPagination
+    cursor_class = PubDateCursorPagination
+
+    def __init__(self):
+        self.paginator = self.offset_class()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.mode_query_param) == self.cursor_mode:
+            self.paginator = self.cursor_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.paginator.get_paginated_response_schema(schema)
+
+    def get_results(self, data):
+        return self.paginator.get_results(data)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_schema_fields(self, view):
+        return self.paginator.get_schema_fields(view)
+
+    def get_schema_operation_parameters(self, view):
+        return self.paginator.get_schema_operation_parameters(view)
+
+
+class ReviewPagination(OptionalCursorPagination):
+    """Отзывы: limit/offset либо курсор."""
+
+    offset_class = LimitOffsetPagination
+
+
+class CommentPagination(OptionalCursorPagination):
+    """Комментарии: номер страницы либо курсор."""
+
+    offset_class = PageNumberPagination
+
+
+class LeaderboardPagination(LimitOffsetPagination):
+    """Рейтинг: первые десять мест, не больше сотни за запрос."""
+
+    default_limit = 10
+    max_limit = 100
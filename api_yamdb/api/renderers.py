@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api_yamdb.metrics import timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DEFAULT_SETTINGS = {
+    'ENCODER': 'auto',
+    'STREAM_MIN_ITEMS': 0,
+    'STREAM_CHUNK_SIZE': 100,
+}
+UTF8 = ('utf-8', 'utf8')
+
+
+def get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'JSON_RENDERER', {})}
+
+
+def use_orjson():
+    """orjson при ENCODER='auto' или 'orjson', если он установлен."""
+    encoder = get_settings()['ENCODER']
+    if encoder == 'orjson' and orjson is None:
+        raise ImproperlyConfigured('JSON_RENDERER: orjson не установлен.')
+    return encoder in ('auto', 'orjson') and orjson is not None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson с тем же результатом, что у DRF.
+
+    Даты, Decimal и прочие типы кодируются через JSONEncoder DRF,
+    поэтому формат совпадает с обычным рендерером. С отступами
+    (`; indent=4`, Browsable API) и без orjson работает json
+    из стандартной библиотеки.
+    """
+
+    @timed('FastJSONRenderer.render')
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if (indent is not None or self.ensure_ascii or not self.compact
+                or not use_orjson()):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+        return ret.replace(
+            '\u2028'.encode(), b'\\u2028'
+        ).replace('\u2029'.encode(), b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser на orjson для тел в UTF-8."""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if encoding.lower() not in UTF8 or not use_orjson():
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+def stream_json(renderer, envelope, chunks, key='results'):
+    """
+    Отдать JSON страницы по частям.
+
+    `envelope` - данные пагинатора, список `key` в них последний и пустой;
+    `chunks` - итератор списков элементов. Результат совпадает с render()
+    всей страницы, но элементы кодируются пачками по мере отдачи.
+    """
+    head = renderer.render(envelope)
+    tail = b'[]}'
+    if not head.endswith(tail) or list(envelope)[-1] != key:
+        raise ValueError(f'Список {key} должен быть последним ключом.')
+    yield head[:-len(tail)] + b'['
+    separator = b''
+    for chunk in chunks:
+        if chunk:
+            yield separator + renderer.render(chunk)[1:-1]
+            separator = b','
+    yield b']}'
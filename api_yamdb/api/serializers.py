@@ -1,16 +1,71 @@
 from datetime import datetime
+from functools import partial
 
-from django.shortcuts import get_object_or_404
+from auths.models import ConfirmationCode
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleRanking, TitleScoreStats)
 from users.models import User
 
 
+class ExpandableFieldsMixin:
+    """
+    Поля, добавляемые по `?expand=`.
+
+    `expandable_fields` сопоставляет имя из контекста `expand`
+    с фабрикой поля. Поля собираются при первом обращении, когда
+    вложенный сериализатор уже знает контекст корневого.
+    """
+
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in self.context.get('expand', ()):
+            factory = self.expandable_fields.get(name)
+            if factory is not None:
+                fields[name] = factory()
+        return fields
+
+
+class SelectableFieldsMixin:
+    """
+    Только поля из `?fields=` (набор `fields` контекста).
+
+    Действует на корневой сериализатор и элементы корневого списка;
+    вложенные сериализаторы и поля из `expand` не урезаются.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get('fields')
+        if selected is None or not self.is_top_level():
+            return fields
+        keep = set(selected) | set(self.context.get('expand', ()))
+        return {
+            name: field for name, field in fields.items() if name in keep
+        }
+
+    def is_top_level(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
 class SignUpSerializer(serializers.ModelSerializer):
-    """Сериалайзер для регистрации."""
+    """
+    Сериалайзер для регистрации.
 
-    email = serializers.EmailField(required=True)
+    Повторная регистрация с теми же username и email не ошибка:
+    пользователь получает новый код подтверждения.
+    """
+
+    username = serializers.RegexField(
+        r'^[\w.@+-]+\Z', max_length=150, required=True
+    )
+    email = serializers.EmailField(required=True, max_length=254)
 
     class Meta:
         fields = ('username', 'email')
@@ -21,37 +76,41 @@ class SignUpSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 '"me" is unusable in usernamefield'
             )
-        elif User.objects.filter(username=data['username']).exists():
-            raise serializers.ValidationError(
-                'User exist'
-            )
+        user = User.objects.filter(username=data['username']).first()
+        if user is not None:
+            if user.email != data['email']:
+                raise serializers.ValidationError(
+                    'User exist'
+                )
         elif User.objects.filter(email=data['email']).exists():
             raise serializers.ValidationError(
                 'one email can use only one user'
             )
+        data['user'] = user
         return data
 
+    def create(self, validated_data):
+        user = validated_data.pop('user')
+        if user is not None:
+            return user
+        return super().create(validated_data)
 
-class TokenObtainSerializer(serializers.ModelSerializer):
+
+class TokenObtainSerializer(serializers.Serializer):
     """Сериалайзер для получения JWT токена."""
 
-    confirmation_code = serializers.CharField(source='password',
-                                              required=True)
+    confirmation_code = serializers.CharField(required=True)
     username = serializers.CharField(required=True)
 
-    class Meta:
-        fields = ('username', 'confirmation_code')
-        model = User
-
     def validate(self, data):
         username = data['username']
-        password = data['password']
-        user = get_object_or_404(User, username=username)
-        if not (user.password == password
-           or user.check_password(password)):
+        code = data['confirmation_code']
+        user = ConfirmationCode.redeem(username, code)
+        if user is None:
             raise serializers.ValidationError(
-                'Not Correct password for this user.'
+                'Неверное имя пользователя или код подтверждения.'
             )
+        data['user'] = user
         return data
 
 
@@ -68,7 +127,8 @@ class UsersSerializer(serializers.ModelSerializer):
         read_only_fields = ['username', 'email', 'role']
 
 
-class AdminRightsSerializer(serializers.ModelSerializer):
+class AdminRightsSerializer(SelectableFieldsMixin,
+                            serializers.ModelSerializer):
     """Административный сериалайзер."""
 
     email = serializers.EmailField(required=True)
@@ -110,9 +170,14 @@ class CurrentTitleDefault:
         return serializer_field.context['title']
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SelectableFieldsMixin, ExpandableFieldsMixin,
+                       serializers.ModelSerializer):
     """Описание сериализатора для модели Review."""
 
+    expandable_fields = {
+        'comment_count': partial(serializers.IntegerField, read_only=True),
+    }
+
     author = SlugRelatedField(read_only=True, slug_field='username',
                               default=serializers.CurrentUserDefault())
     title = serializers.HiddenField(default=CurrentTitleDefault())
@@ -120,15 +185,9 @@ class ReviewSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ('id', 'text', 'author', 'score', 'pub_date', 'title')
         model = Review
-        validators = [
-            serializers.UniqueTogetherValidator(
-                queryset=Review.objects.all(),
-                fields=['author', 'title']
-            )
-        ]
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SelectableFieldsMixin, serializers.ModelSerializer):
     """Описание сериализатора для модели Comment."""
     author = SlugRelatedField(read_only=True, slug_field='username',
                               default=serializers.CurrentUserDefault())
@@ -154,12 +213,15 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ('name', 'slug',)
 
 
-class GetTitleSerializer(serializers.ModelSerializer):
+class GetTitleSerializer(SelectableFieldsMixin, ExpandableFieldsMixin,
+                         serializers.ModelSerializer):
     """Описание сериализатора для модели Title: метод GET."""
 
-    rating = serializers.IntegerField(
-        source='reviews__score__avg', read_only=True
-    )
+    expandable_fields = {
+        'latest_reviews': partial(ReviewSerializer, many=True,
+                                  read_only=True),
+    }
+    rating = serializers.IntegerField(read_only=True)
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
 
@@ -197,3 +259,39 @@ class TitleSerializer(serializers.ModelSerializer):
                 'Год произведения должен быть не больше текущего года.'
             )
         return value
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    """Статистика оценок произведения."""
+
+    title = serializers.IntegerField(source='title_id', read_only=True)
+    count = serializers.IntegerField(source='reviews_count', read_only=True)
+    mean = serializers.FloatField(read_only=True)
+    median = serializers.FloatField(read_only=True)
+    histogram = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = ('title', 'count', 'mean', 'median', 'histogram')
+        model = TitleScoreStats
+
+    def get_histogram(self, obj):
+        return {str(score): amount for score, amount in obj.histogram.items()}
+
+
+class TitleRankingSerializer(serializers.ModelSerializer):
+    """Место произведения в рейтинге лучших."""
+
+    rank = serializers.IntegerField(read_only=True)
+    id = serializers.IntegerField(source='title_id', read_only=True)
+    name = serializers.CharField(source='title.name', read_only=True)
+    year = serializers.IntegerField(source='title.year', read_only=True)
+    rating = serializers.IntegerField(source='title.rating', read_only=True)
+    score = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = ('rank', 'id', 'name', 'year', 'rating', 'score',
+                  'reviews_count')
+        model = TitleRanking
+
+    def get_score(self, obj):
+        return round(obj.score, 2)
@@ -1,5 +1,6 @@
 from api.views import (AdminViewSet, CategoryViewSet, CommentViewSet,
-                       GenreViewSet, ReviewViewSet, SignUpViewSet,
+                       ExportView, GenreViewSet, LeaderboardView,
+                       ResponseCacheStatsView, ReviewViewSet, SignUpViewSet,
                        TitleViewSet, TokenObtainViewSet)
 from django.urls import include, path
 from rest_framework import routers
@@ -21,5 +22,14 @@ router.register('categories', CategoryViewSet, basename='categories')
 urlpatterns = [
     path('api/v1/auth/signup/', SignUpViewSet.as_view()),
     path('api/v1/auth/token/', TokenObtainViewSet.as_view()),
+    path('api/v1/cache/stats/', ResponseCacheStatsView.as_view()),
+    path('api/v1/export/<str:dataset>/', ExportView.as_view()),
+    path('api/v1/leaderboards/', LeaderboardView.as_view()),
+    path('api/v1/leaderboards/genres/<slug:slug>/',
+         LeaderboardView.as_view(), {'scope': 'genre'}),
+    path('api/v1/leaderboards/categories/<slug:slug>/',
+         LeaderboardView.as_view(), {'scope': 'category'}),
+    path('api/v1/leaderboards/years/<int:year>/',
+         LeaderboardView.as_view(), {'scope': 'year'}),
     path('api/v1/', include(router.urls)),
 ]
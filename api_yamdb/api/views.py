@@ -1,29 +1,46 @@
-from django.conf import settings
-from django.contrib.auth.base_user import BaseUserManager
+from collections import defaultdict
+
+from auths.mail import enqueue_mail
+from auths.models import ConfirmationCode
 from django.contrib.auth.hashers import make_password
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import exceptions, permissions, status
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.generics import ListAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
-from reviews.models import Category, Genre, Review, Title
+from reviews import export, leaderboard
+from reviews.models import (Category, Genre, Review, Title, TitleScoreStats,
+                            VersionStamp)
 from users.models import User
 
-from .filters import TitlesFilter
-from .mixins import CustomHandlerModelViewSet, GetPostDeleteViewset
+from .bulk import bulk_write_slugged, bulk_write_titles
+from .cache import get_stats
+from .fast import (FastCommentSerializer, FastReviewSerializer,
+                   FastTitleSerializer)
+from .filters import (NullsLastOrderingFilter, TitleSearchFilter, TitlesFilter,
+                      forget_slug)
+from .mixins import (BulkWriteMixin, CustomHandlerModelViewSet, ExpandMixin,
+                     FastReadMixin, GetPostDeleteViewset, NestedParentMixin,
+                     ResponseCacheMixin, SparseFieldsMixin)
+from .pagination import (CommentPagination, LeaderboardPagination,
+                         ReviewPagination)
 from .permissions import AdminOnly, AdminOrReadOnly, IsAuthorOrReadOnly
 from .serializers import (AdminPatchSerializer, AdminRightsSerializer,
                           CategorySerializer, CommentSerializer,
                           GenreSerializer, GetTitleSerializer,
-                          ReviewSerializer, SignUpSerializer, TitleSerializer,
-                          TokenObtainSerializer, UsersSerializer)
+                          ReviewSerializer, SignUpSerializer,
+                          TitleRankingSerializer, TitleSerializer,
+                          TitleStatsSerializer, TokenObtainSerializer,
+                          UsersSerializer)
 
 
 class SignUpViewSet(APIView):
@@ -31,19 +48,16 @@ class SignUpViewSet(APIView):
 
     permission_classes = [permissions.AllowAny]
 
+    @transaction.atomic
     def post(self, request):
-        password = BaseUserManager().make_random_password()
         serializer = SignUpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(
-            password=make_password(password)
-        )
-        send_mail(
+        user = serializer.save(password=make_password(None))
+        code = ConfirmationCode.issue(user)
+        enqueue_mail(
             'confirmation_code',
-            str(password),
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[serializer.data['email']],
-            fail_silently=False
+            code,
+            recipient=serializer.data['email']
         )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -56,17 +70,14 @@ class TokenObtainViewSet(APIView):
     def post(self, request):
         serializer = TokenObtainSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = get_object_or_404(
-            User,
-            username=serializer.data['username']
-        )
+        user = serializer.validated_data['user']
         return Response(
             {'token': user.token},
             status=status.HTTP_200_OK
         )
 
 
-class AdminViewSet(ModelViewSet):
+class AdminViewSet(SparseFieldsMixin, ModelViewSet):
     """Класс для администратора."""
 
     serializer_class = AdminRightsSerializer
@@ -75,6 +86,12 @@ class AdminViewSet(ModelViewSet):
     lookup_field = 'username'
     filter_backends = [SearchFilter]
     search_fields = ['=username']
+    sparse_fields = {
+        name: (name,) for name in AdminRightsSerializer.Meta.fields
+    }
+
+    def get_queryset(self):
+        return self.sparse_queryset(super().get_queryset())
 
     def get_serializer_class(self):
         if self.request.method in ('PATCH', 'PUT'):
@@ -119,68 +136,220 @@ class AdminViewSet(ModelViewSet):
         )
 
 
-class ReviewViewSet(CustomHandlerModelViewSet):
-    """Описание вьюсета для работы с моделью Review."""
+class ReviewViewSet(NestedParentMixin, SparseFieldsMixin, ExpandMixin,
+                    FastReadMixin, CustomHandlerModelViewSet):
+    """
+    Описание вьюсета для работы с моделью Review.
+
+    `?expand=comment_count` добавляет число комментариев отзыва.
+    """
 
     serializer_class = ReviewSerializer
+    fast_serializer_class = FastReviewSerializer
     permission_classes = (IsAuthorOrReadOnly,)
-    pagination_class = LimitOffsetPagination
+    pagination_class = ReviewPagination
+    read_from_replica = True
+    parent_model = Title
+    parent_lookups = {'pk': 'title_id'}
+    expandable = ('comment_count',)
+    sparse_fields = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+    }
+    sparse_required = ('pub_date',)
 
     def get_serializer_context(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return {'title': title,
-                'request': self.request}
+        context = super().get_serializer_context()
+        context['title'] = self.get_parent()
+        return context
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        new_queryset = title.reviews.all()
-        return new_queryset
+        return self.expand_queryset(self.sparse_queryset(
+            self.get_parent().reviews.select_related('author')
+        ))
+
+    def expand_queryset(self, queryset):
+        if 'comment_count' in self.get_expand():
+            queryset = queryset.annotate(comment_count=Count('comments'))
+        return queryset
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user,
+                                title=self.get_parent())
+        except IntegrityError:
+            raise exceptions.ValidationError(
+                {'non_field_errors': [
+                    'Можно оставить только один отзыв на произведение.'
+                ]}
+            )
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
 
 
-class CommentViewSet(CustomHandlerModelViewSet):
+class CommentViewSet(NestedParentMixin, SparseFieldsMixin, FastReadMixin,
+                     CustomHandlerModelViewSet):
     """Описание вьюсета для работы с моделью Comment."""
 
     serializer_class = CommentSerializer
+    fast_serializer_class = FastCommentSerializer
     permission_classes = (IsAuthorOrReadOnly,)
-
-    @staticmethod
-    def __get_review(kwargs):
-        review = get_object_or_404(
-            Review,
-            pk=kwargs.get('review_id'),
-            title=kwargs.get('title_id')
-        )
-        return review
+    pagination_class = CommentPagination
+    read_from_replica = True
+    parent_model = Review
+    parent_lookups = {'pk': 'review_id', 'title': 'title_id'}
+    sparse_fields = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'pub_date': ('pub_date',),
+    }
+    sparse_required = ('pub_date',)
 
     def get_queryset(self):
-        review = self.__get_review(self.kwargs)
-        new_queryset = review.comments.all()
-        return new_queryset
+        return self.sparse_queryset(
+            self.get_parent().comments.select_related('author')
+        )
 
     def perform_create(self, serializer):
-        review = self.__get_review(self.kwargs)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_parent())
 
 
-class TitleViewSet(CustomHandlerModelViewSet):
-    """Описание вьюсета для работы с моделью Title."""
+class TitleViewSet(BulkWriteMixin, ResponseCacheMixin, SparseFieldsMixin,
+                   ExpandMixin, FastReadMixin, CustomHandlerModelViewSet):
+    """
+    Описание вьюсета для работы с моделью Title.
 
-    queryset = Title.objects.all().annotate(Avg('reviews__score'))
-    filter_backends = (DjangoFilterBackend,)
+    `?expand=latest_reviews` встраивает LATEST_REVIEWS последних
+    отзывов, `&expand=comment_count` - число комментариев каждого из них.
+    Всё это - один дополнительный запрос на страницу.
+    `?fields=` без genre обходится без запроса жанров.
+    """
+
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter,
+                       NullsLastOrderingFilter)
     filterset_class = TitlesFilter
+    ordering_fields = ('rating', 'year', 'name')
+    fast_serializer_class = FastTitleSerializer
+    read_from_replica = True
     permission_classes = (AdminOrReadOnly,)
+    version_scope = 'titles'
+    expandable = ('latest_reviews', 'comment_count')
+    sparse_fields = {
+        'id': ('id',),
+        'name': ('name',),
+        'rating': ('rating',),
+        'year': ('year',),
+        'description': ('description',),
+        'genre': (),
+        'category': ('category__name', 'category__slug'),
+    }
+    sparse_prefetch = {'genre': 'genre'}
+    MAX_STATS_IDS = 100
+    LATEST_REVIEWS = 3
 
     def get_serializer_class(self):
         if self.request.method in ('GET', 'LIST'):
             return GetTitleSerializer
         return TitleSerializer
 
-
-class GenreViewSet(GetPostDeleteViewset):
+    def get_queryset(self):
+        return self.sparse_queryset(super().get_queryset())
+
+    def expand_objects(self, titles):
+        expand = self.get_expand()
+        if 'latest_reviews' not in expand:
+            return
+        reviews = Review.latest_per_title(
+            [title.pk for title in titles], self.LATEST_REVIEWS
+        ).select_related('author')
+        if 'comment_count' in expand:
+            reviews = reviews.annotate(comment_count=Count('comments'))
+        latest = defaultdict(list)
+        for review in reviews:
+            latest[review.title_id].append(review)
+        for title in titles:
+            title.latest_reviews = latest[title.pk]
+
+    def is_versioned(self, request):
+        """
+        Комментарии не меняют версию произведений, а правка текста
+        отзыва - версию их списка: такие ответы отдаются без кэша.
+        """
+        expand = self.get_expand()
+        if 'comment_count' in expand:
+            return False
+        return self.action != 'list' or not expand
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        title = serializer.save()
+        VersionStamp.bump('titles', title.pk)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        title = serializer.save()
+        VersionStamp.bump('titles', title.pk)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        title_id = instance.pk
+        instance.delete()
+        VersionStamp.bump('titles', title_id)
+
+    def bulk_write(self, items, upsert):
+        return bulk_write_titles(items, upsert)
+
+    @action(methods=['GET'], detail=True, url_path='stats')
+    def stats(self, request, pk=None):
+        stats = TitleScoreStats.objects.filter(title_id=pk).first()
+        if stats is None:
+            title = get_object_or_404(Title, pk=pk)
+            stats = TitleScoreStats(title=title)
+        return Response(TitleStatsSerializer(stats).data)
+
+    @action(methods=['GET'], detail=False, url_path='stats')
+    def bulk_stats(self, request):
+        """Статистика для нескольких произведений: `?ids=1,2,3`."""
+        try:
+            ids = {int(pk) for pk in request.query_params.get(
+                'ids', ''
+            ).split(',') if pk.strip()}
+        except ValueError:
+            raise exceptions.ValidationError({'ids': 'Ожидаются числа.'})
+        if len(ids) > self.MAX_STATS_IDS:
+            raise exceptions.ValidationError(
+                {'ids': f'Не больше {self.MAX_STATS_IDS} произведений.'}
+            )
+        found = {
+            stats.title_id: stats
+            for stats in TitleScoreStats.objects.filter(title_id__in=ids)
+        }
+        missing = ids - set(found)
+        for title_id in Title.objects.filter(
+            pk__in=missing
+        ).values_list('pk', flat=True):
+            found[title_id] = TitleScoreStats(title_id=title_id)
+        stats = [found[title_id] for title_id in sorted(found)]
+        return Response(TitleStatsSerializer(stats, many=True).data)
+
+
+class GenreViewSet(BulkWriteMixin, ResponseCacheMixin,
+                   GetPostDeleteViewset):
     """Описание вьюсета для работы с моделью Genre"""
 
     serializer_class = GenreSerializer
@@ -189,9 +358,28 @@ class GenreViewSet(GetPostDeleteViewset):
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
     permission_classes = (AdminOrReadOnly,)
+    version_scope = 'genres'
+    read_from_replica = True
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        serializer.save()
+        VersionStamp.bump('genres')
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        slug = instance.slug
+        transaction.on_commit(lambda: forget_slug(Genre, slug))
+        VersionStamp.bump('genres')
+        VersionStamp.bump('titles')
+
+    def bulk_write(self, items, upsert):
+        return bulk_write_slugged(Genre, items, upsert)
 
 
-class CategoryViewSet(GetPostDeleteViewset):
+class CategoryViewSet(BulkWriteMixin, ResponseCacheMixin,
+                      GetPostDeleteViewset):
     """Описание вьюсета для работы с моделью Category"""
 
     serializer_class = CategorySerializer
@@ -200,3 +388,112 @@ class CategoryViewSet(GetPostDeleteViewset):
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
     permission_classes = (AdminOrReadOnly,)
+    version_scope = 'categories'
+    read_from_replica = True
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        serializer.save()
+        VersionStamp.bump('categories')
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        slug = instance.slug
+        transaction.on_commit(lambda: forget_slug(Category, slug))
+        VersionStamp.bump('categories')
+        VersionStamp.bump('titles')
+
+    def bulk_write(self, items, upsert):
+        return bulk_write_slugged(Category, items, upsert)
+
+
+class ResponseCacheStatsView(APIView):
+    """
+    Счётчики попаданий и промахов кэша ответов.
+
+    Счётчики свои у каждого воркера, как и в /metrics;
+    суммирует их Prometheus.
+    """
+
+    permission_classes = [AdminOnly]
+
+    def get(self, request):
+        scopes = [viewset.version_scope for viewset in (
+            TitleViewSet, GenreViewSet, CategoryViewSet
+        )]
+        return Response(get_stats(scopes), status=status.HTTP_200_OK)
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка titles, reviews или comments в NDJSON или CSV.
+
+    `?output=csv` меняет формат. Для инкрементальной выгрузки передаются
+    `since` (pub_date) и `after_id` последней полученной строки.
+    """
+
+    permission_classes = [AdminOnly]
+
+    def get(self, request, dataset):
+        if dataset not in export.DATASETS:
+            raise exceptions.NotFound('Нет такого набора данных.')
+        output = request.query_params.get('output', 'ndjson')
+        if output not in export.OUTPUTS:
+            raise exceptions.ValidationError(
+                {'output': f'Допустимо: {", ".join(export.OUTPUTS)}.'}
+            )
+        since = request.query_params.get('since')
+        if since is not None:
+            since = parse_datetime(since)
+            if since is None:
+                raise exceptions.ValidationError(
+                    {'since': 'Ожидается дата и время в ISO 8601.'}
+                )
+        after_id = request.query_params.get('after_id')
+        if after_id is not None:
+            if not after_id.isdigit():
+                raise exceptions.ValidationError(
+                    {'after_id': 'Ожидается число.'}
+                )
+            after_id = int(after_id)
+        response = StreamingHttpResponse(
+            export.export(dataset, output, since, after_id),
+            content_type=export.OUTPUTS[output]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{dataset}.{output}"'
+        )
+        return response
+
+
+class LeaderboardView(ListAPIView):
+    """
+    Лучшие произведения по байесовскому среднему оценок.
+
+    Общий рейтинг или рейтинг жанра, категории либо года - по
+    аргументу `scope` маршрута. Читается из таблицы TitleRanking.
+    """
+
+    serializer_class = TitleRankingSerializer
+    pagination_class = LeaderboardPagination
+    permission_classes = [permissions.AllowAny]
+    read_from_replica = True
+
+    def get_queryset(self):
+        scope = self.kwargs.get('scope')
+        if scope == 'genre':
+            return leaderboard.ranking(
+                genre=get_object_or_404(Genre, slug=self.kwargs['slug'])
+            )
+        if scope == 'category':
+            return leaderboard.ranking(category=get_object_or_404(
+                Category, slug=self.kwargs['slug']
+            ))
+        return leaderboard.ranking(year=self.kwargs.get('year'))
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        for rank, entry in enumerate(page, start=self.paginator.offset + 1):
+            entry.rank = rank
+        return page
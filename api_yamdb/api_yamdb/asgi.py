@@ -1,7 +1,82 @@
+"""
+ASGI-точка входа: `gunicorn api_yamdb.asgi:application -k
+uvicorn.workers.UvicornWorker`.
+
+В Django 2.2 нет асинхронных вьюх и ORM, поэтому приложение -
+то же WSGI-приложение за мостом asgiref. Тело запроса дочитывается
+в цикле событий, и только потом вьюха занимает поток из пула
+на ASGI_THREADS потоков; размер пула ограничивает и число
+соединений с базой на процесс.
+"""
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-from django.core.asgi import get_asgi_application
+from asgiref.sync import SyncToAsync
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
+
+def closing(wsgi_application):
+    """
+    Вызов close() у ответа, как это делает WSGI-сервер.
+
+    WsgiToAsgi его не вызывает, а без него Django не шлёт
+    request_finished и не закрывает устаревшие соединения с базой.
+    """
+    def application(environ, start_response):
+        response = wsgi_application(environ, start_response)
+        try:
+            yield from response
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+    return application
+
+
+class PooledWsgiToAsgiInstance(WsgiToAsgiInstance):
+    """
+    Запрос в потоке из общего пула.
+
+    В asgiref run_wsgi_app помечен thread_sensitive, и все запросы
+    выполняются по очереди в одном потоке.
+    """
+
+    run_wsgi_app_sync = WsgiToAsgiInstance.__dict__['run_wsgi_app'].func
+
+    def __init__(self, wsgi_application, executor):
+        super().__init__(wsgi_application)
+        self.executor = executor
+
+    async def run_wsgi_app(self, body):
+        await SyncToAsync(
+            self.run_wsgi_app_sync, thread_sensitive=False,
+            executor=self.executor
+        )(body)
+
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    """WSGI-приложение как ASGI с ограниченным пулом потоков."""
+
+    def __init__(self, wsgi_application, threads):
+        super().__init__(closing(wsgi_application))
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix='asgi'
+        )
+
+    async def __call__(self, scope, receive, send):
+        await PooledWsgiToAsgiInstance(
+            self.wsgi_application, self.executor
+        )(scope, receive, send)
+
+
+def get_asgi_application(threads=None):
+    wsgi_application = get_wsgi_application()
+    return PooledWsgiToAsgi(
+        wsgi_application, threads or settings.ASGI_THREADS
+    )
+
+
 application = get_asgi_application()
@@ -0,0 +1,89 @@
+import threading
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+STICKY_COOKIE = 'db_primary'
+
+state = threading.local()
+
+
+def get_replica():
+    """Алиас реплики, если она настроена."""
+    alias = getattr(settings, 'DATABASE_REPLICA', None)
+    return alias if alias in settings.DATABASES else None
+
+
+def check_connections(**kwargs):
+    """
+    Закрыть постоянные соединения, которые перестали отвечать.
+
+    Вызывается по request_started после close_old_connections:
+    с CONN_MAX_AGE соединение живёт между запросами, и после
+    перезапуска базы или pgbouncer первый запрос иначе упадёт.
+    """
+    if not getattr(settings, 'DATABASE_HEALTH_CHECKS', False):
+        return
+    for connection in connections.all():
+        if connection.connection is not None and not connection.is_usable():
+            connection.close()
+
+
+class PrimaryReplicaRouter:
+    """
+    Чтение с реплики для запросов, отмеченных ReplicaRoutingMiddleware.
+
+    Всё остальное, включая запись и миграции, идёт в default.
+    """
+
+    def db_for_read(self, model, **hints):
+        if getattr(state, 'use_replica', False):
+            return get_replica()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Отправляет GET к вьюсетам с `read_from_replica = True` на реплику.
+
+    После успешной записи клиент получает cookie, и на время
+    DATABASE_REPLICA_STICKY_SECONDS его чтения идут в primary,
+    чтобы он видел собственные изменения несмотря на задержку реплики.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state.use_replica = False
+        try:
+            response = self.get_response(request)
+        finally:
+            state.use_replica = False
+        if (get_replica() and request.method not in SAFE_METHODS
+                and response.status_code < 400):
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                httponly=True
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        state.use_replica = bool(
+            get_replica()
+            and request.method in SAFE_METHODS
+            and getattr(view_class, 'read_from_replica', False)
+            and STICKY_COOKIE not in request.COOKIES
+        )
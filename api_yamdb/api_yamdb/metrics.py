@@ -0,0 +1,270 @@
+import functools
+import ipaddress
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 1.0,
+    'BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+    'TOKEN': '',
+    'ALLOWED_IPS': ('127.0.0.1', '::1'),
+    'PUBLIC': False,
+}
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+HELP = {
+    'yamdb_requests_total': 'Ответы по вьюхам и статусам.',
+    'yamdb_requests_sampled_total': 'Запросы, попавшие в выборку.',
+    'yamdb_request_duration_seconds': 'Время ответа, секунды.',
+    'yamdb_db_queries_total': 'SQL-запросы в запросах из выборки.',
+    'yamdb_db_query_seconds_total': (
+        'Время SQL-запросов в запросах из выборки, секунды.'
+    ),
+    'yamdb_response_bytes_total': 'Размер ответов из выборки, байты.',
+    'yamdb_section_duration_seconds': (
+        'Время участков кода, отмеченных @timed, секунды.'
+    ),
+    'yamdb_response_cache_hits_total': 'Попадания в кэш ответов.',
+    'yamdb_response_cache_misses_total': 'Промахи кэша ответов.',
+}
+
+state = threading.local()
+
+
+def get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'METRICS', {})}
+
+
+class Histogram:
+    """Накопительная гистограмма в формате Prometheus."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name, labels):
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield f'{name}_bucket{format_labels(labels, le=bound)} {total}'
+        yield f'{name}_sum{format_labels(labels)} {self.sum}'
+        yield f'{name}_count{format_labels(labels)} {total}'
+
+
+def format_labels(labels, **extra):
+    pairs = {**dict(labels), **extra}
+    if not pairs:
+        return ''
+    body = ','.join(
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace(
+            '"', '\\"'
+        ))
+        for key, value in pairs.items()
+    )
+    return '{' + body + '}'
+
+
+def family_header(name, kind):
+    if name in HELP:
+        yield f'# HELP {name} {HELP[name]}'
+    yield f'# TYPE {name} {kind}'
+
+
+class Registry:
+    """
+    Метрики процесса: счётчики и гистограммы с метками.
+
+    У каждого воркера gunicorn свой реестр; Prometheus собирает
+    их по отдельности, суммирование - на его стороне.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counters = defaultdict(float)
+            self.histograms = {}
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            self.counters[name, tuple(sorted(labels.items()))] += value
+
+    def value(self, name, labels):
+        with self.lock:
+            return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(get_settings()['BUCKETS'])
+                self.histograms[key] = histogram
+            histogram.observe(value)
+
+    def render(self):
+        """Текстовый формат Prometheus: семейство за семейством."""
+        lines = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+            family = None
+            for (name, labels), value in counters:
+                if name != family:
+                    family = name
+                    lines.extend(family_header(name, 'counter'))
+                lines.append(f'{name}{format_labels(labels)} {value}')
+            for (name, labels), histogram in histograms:
+                if name != family:
+                    family = name
+                    lines.extend(family_header(name, 'histogram'))
+                lines.extend(histogram.lines(name, labels))
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def timed(section):
+    """Время вызова функции в запросах, попавших в выборку."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not getattr(state, 'sampled', False):
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe(
+                    'yamdb_section_duration_seconds', {'section': section},
+                    time.perf_counter() - started
+                )
+        return wrapper
+    return decorator
+
+
+def get_view_name(view_func, method):
+    """`TitleViewSet.list` для DRF, модуль и имя функции для прочих."""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return f'{view_func.__module__}.{view_func.__name__}'
+    actions = getattr(view_func, 'actions', None) or {}
+    action = actions.get(method.lower(), method.lower())
+    return f'{view_class.__name__}.{action}'
+
+
+class QueryCounter:
+    """execute_wrapper: число и суммарное время SQL-запросов."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """
+    Время ответа, SQL-запросы и размер ответа по вьюхам.
+
+    Счётчик запросов ведётся всегда, остальное - для доли запросов
+    METRICS['SAMPLE_RATE'], чтобы под нагрузкой накладные расходы
+    оставались незаметными.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        options = get_settings()
+        if not options['ENABLED']:
+            return self.get_response(request)
+        request.metrics_view = 'unresolved'
+        state.sampled = random.random() < options['SAMPLE_RATE']
+        if not state.sampled:
+            response = self.get_response(request)
+            self.count(request, response)
+            return response
+        queries = QueryCounter()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(queries))
+                response = self.get_response(request)
+        finally:
+            state.sampled = False
+        labels = {'view': request.metrics_view}
+        registry.observe('yamdb_request_duration_seconds', labels,
+                         time.perf_counter() - started)
+        registry.inc('yamdb_requests_sampled_total', labels)
+        registry.inc('yamdb_db_queries_total', labels, queries.count)
+        registry.inc('yamdb_db_query_seconds_total', labels,
+                     queries.duration)
+        if not response.streaming:
+            registry.inc('yamdb_response_bytes_total', labels,
+                         len(response.content))
+        self.count(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics_view = get_view_name(view_func, request.method)
+
+    @staticmethod
+    def count(request, response):
+        registry.inc('yamdb_requests_total', {
+            'view': request.metrics_view,
+            'status': response.status_code,
+        })
+
+
+def is_allowed(request, options):
+    """
+    Доступ к метрикам: по токену, если он задан, иначе с адресов
+    ALLOWED_IPS (адреса и сети). PUBLIC=True открывает их всем.
+    """
+    if options['TOKEN']:
+        return constant_time_compare(
+            request.META.get('HTTP_AUTHORIZATION', ''),
+            f'Bearer {options["TOKEN"]}'
+        )
+    if options['PUBLIC']:
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network.strip(), strict=False)
+        for network in options['ALLOWED_IPS'] if network.strip()
+    )
+
+
+def metrics_view(request):
+    """Метрики в текстовом формате Prometheus."""
+    if not is_allowed(request, get_settings()):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.fields import Field
+
+from .metrics import get_view_name
+
+DEFAULT_SETTINGS = {
+    'ENABLED': False,
+    'REPEAT_THRESHOLD': 3,
+    'SLOW_QUERY_MS': 100,
+    'OUTPUTS': ('header', 'log'),
+    'REPORT_DIR': None,
+}
+HEADER = 'X-Query-Issues'
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+logger = logging.getLogger(__name__)
+
+STRING = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDERS = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+SPACES = re.compile(r'\s+')
+
+
+def get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'QUERY_DETECTOR', {})}
+
+
+def fingerprint(sql):
+    """
+    Форма запроса без значений.
+
+    Литералы заменяются на `?`, списки IN любой длины - на `(...)`,
+    поэтому запросы, отличающиеся только параметрами, совпадают.
+    """
+    sql = STRING.sub('?', sql)
+    sql = NUMBER.sub('?', sql)
+    sql = PLACEHOLDERS.sub('(...)', sql)
+    return SPACES.sub(' ', sql).strip()
+
+
+def find_origin():
+    """
+    Место в коде проекта и поле сериализатора, откуда пришёл запрос.
+
+    Поле - ближайший по стеку `self`, являющийся полем DRF
+    с родительским сериализатором.
+    """
+    location = field = None
+    frame = sys._getframe(2)
+    while frame is not None and (location is None or field is None):
+        path = frame.f_code.co_filename
+        if (location is None and path.startswith(settings.BASE_DIR)
+                and not path.startswith(PACKAGE_DIR)):
+            location = '{}:{} in {}'.format(
+                os.path.relpath(path, settings.BASE_DIR),
+                frame.f_lineno, frame.f_code.co_name
+            )
+        owner = frame.f_locals.get('self')
+        if (field is None and isinstance(owner, Field)
+                and getattr(owner, 'parent', None) is not None
+                and owner.field_name):
+            field = f'{type(owner.parent).__name__}.{owner.field_name}'
+        frame = frame.f_back
+    return location, field
+
+
+class QueryDetector:
+    """
+    Сбор SQL-запросов блока кода и поиск N+1 и медленных запросов.
+
+    Используется как контекстный менеджер - в middleware
+    и в тестах через фикстуру `query_detector`.
+    """
+
+    def __init__(self, view=None, repeat_threshold=None, slow_query_ms=None):
+        options = get_settings()
+        self.view = view
+        self.repeat_threshold = (
+            repeat_threshold or options['REPEAT_THRESHOLD']
+        )
+        self.slow_query_ms = slow_query_ms or options['SLOW_QUERY_MS']
+        self.queries = []
+        self.stack = ExitStack()
+
+    def __enter__(self):
+        for connection in connections.all():
+            self.stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stack.close()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            location, field = find_origin()
+            self.queries.append({
+                'sql': sql,
+                'fingerprint': fingerprint(sql),
+                'duration_ms': round(duration, 3),
+                'location': location,
+                'field': field,
+            })
+
+    def repeated(self):
+        groups = defaultdict(list)
+        for query in self.queries:
+            groups[query['fingerprint']].append(query)
+        return [
+            {
+                'fingerprint': shape,
+                'count': len(queries),
+                'locations': sorted({
+                    query['location'] for query in queries
+                    if query['location']
+                }),
+                'fields': sorted({
+                    query['field'] for query in queries if query['field']
+                }),
+            }
+            for shape, queries in groups.items()
+            if len(queries) >= self.repeat_threshold
+        ]
+
+    def slow(self):
+        return [
+            query for query in self.queries
+            if query['duration_ms'] >= self.slow_query_ms
+        ]
+
+    def report(self):
+        return {
+            'view': self.view,
+            'queries': len(self.queries),
+            'repeated': self.repeated(),
+            'slow': self.slow(),
+        }
+
+
+class QueryDetectorMiddleware:
+    """
+    Проверка каждого запроса на N+1 и медленные SQL-запросы.
+
+    Включается QUERY_DETECTOR['ENABLED'] - для разработки и стейджинга.
+    Найденное пишется в заголовок X-Query-Issues, лог и/или JSON-файл
+    в REPORT_DIR, в зависимости от QUERY_DETECTOR['OUTPUTS'].
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        options = get_settings()
+        if not options['ENABLED']:
+            return self.get_response(request)
+        request.query_detector_view = 'unresolved'
+        with QueryDetector() as detector:
+            response = self.get_response(request)
+        detector.view = request.query_detector_view
+        report = detector.report()
+        if report['repeated'] or report['slow']:
+            self.publish(request, response, report, options)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_detector_view = get_view_name(view_func, request.method)
+
+    @staticmethod
+    def publish(request, response, report, options):
+        outputs = options['OUTPUTS']
+        if 'header' in outputs:
+            response[HEADER] = 'n+1={}; slow={}'.format(
+                len(report['repeated']), len(report['slow'])
+            )
+        if 'log' in outputs:
+            for issue in report['repeated']:
+                logger.warning(
+                    '%s: %s повторов запроса %s (%s; поле %s)',
+                    report['view'], issue['count'], issue['fingerprint'],
+                    ', '.join(issue['locations']) or '?',
+                    ', '.join(issue['fields']) or '-'
+                )
+            for query in report['slow']:
+                logger.warning(
+                    '%s: медленный запрос %s мс: %s (%s)',
+                    report['view'], query['duration_ms'], query['sql'],
+                    query['location'] or '?'
+                )
+        if 'file' in outputs and options['REPORT_DIR']:
+            os.makedirs(options['REPORT_DIR'], exist_ok=True)
+            name = '{}-{}.json'.format(
+                time.strftime('%Y%m%d-%H%M%S'), report['view']
+            )
+            path = os.path.join(options['REPORT_DIR'], name)
+            with open(path, 'w', encoding='utf-8') as report_file:
+                json.dump({'path': request.get_full_path(), **report},
+                          report_file, ensure_ascii=False, indent=2)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -32,6 +33,8 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'api_yamdb.metrics.MetricsMiddleware',
+    'api_yamdb.querydetector.QueryDetectorMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,6 +42,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api_yamdb.db.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -62,13 +66,42 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', 10))
+
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'ENGINE': os.getenv('DB_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': os.getenv('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
     }
 }
+if DATABASES['default']['ENGINE'] != 'django.db.backends.sqlite3':
+    DATABASES['default'].update({
+        'NAME': os.getenv('DB_NAME', 'postgres'),
+        'USER': os.getenv('POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+        'HOST': os.getenv('DB_HOST', ''),
+        'PORT': os.getenv('DB_PORT', '5432'),
+    })
+
+DATABASE_HEALTH_CHECKS = os.getenv('DB_HEALTH_CHECKS', 'True') == 'True'
+
+DATABASE_REPLICA = None
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASE_REPLICA = 'replica'
+    DATABASES[DATABASE_REPLICA] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['api_yamdb.db.PrimaryReplicaRouter']
+
+DATABASE_REPLICA_STICKY_SECONDS = int(
+    os.getenv('DB_REPLICA_STICKY_SECONDS', 10)
+)
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -100,6 +133,15 @@ USE_TZ = True
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+MAIL_QUEUE = {
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 30,
+    'MAX_RETRY_DELAY': 3600,
+    'KEEP_SENT': 7,
+    'KEEP_DEAD': 1,
+}
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
@@ -115,6 +157,21 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
+
+JSON_RENDERER = {
+    'ENCODER': os.getenv('JSON_RENDERER_ENCODER', 'auto'),
+    'STREAM_MIN_ITEMS': int(os.getenv('JSON_STREAM_MIN_ITEMS', 0)),
+    'STREAM_CHUNK_SIZE': 100,
 }
 
 SIMPLE_JWT = {
@@ -122,3 +179,85 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'ALGORITHM': 'HS384',
 }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': os.getenv(
+            'SHARED_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv(
+            'SHARED_CACHE_LOCATION',
+            os.path.join(tempfile.gettempdir(), 'api_yamdb_cache')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('SHARED_CACHE_MAX_ENTRIES', 20000)),
+        },
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 5000)),
+        },
+    },
+}
+
+METRICS = {
+    'ENABLED': os.getenv('METRICS_ENABLED', 'True') == 'True',
+    'SAMPLE_RATE': float(os.getenv('METRICS_SAMPLE_RATE', 1.0)),
+    'TOKEN': os.getenv('METRICS_TOKEN', ''),
+    'ALLOWED_IPS': os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(','),
+    'PUBLIC': os.getenv('METRICS_PUBLIC', 'False') == 'True',
+}
+
+QUERY_DETECTOR = {
+    'ENABLED': os.getenv('QUERY_DETECTOR_ENABLED', 'False') == 'True',
+    'REPEAT_THRESHOLD': 3,
+    'SLOW_QUERY_MS': int(os.getenv('QUERY_DETECTOR_SLOW_MS', 100)),
+    'OUTPUTS': os.getenv('QUERY_DETECTOR_OUTPUTS', 'header,log').split(','),
+    'REPORT_DIR': os.getenv(
+        'QUERY_DETECTOR_REPORT_DIR', os.path.join(BASE_DIR, 'query_reports')
+    ),
+}
+
+RESPONSE_CACHE = {
+    'CACHE_ALIAS': 'responses',
+    'DEFAULT_TIMEOUT': 60,
+    'TIMEOUTS': {
+        'titles': 60,
+        'genres': 300,
+        'categories': 300,
+    },
+}
+
+SLUG_CACHE_ALIAS = 'shared'
+SLUG_CACHE_TIMEOUT = 300
+
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 1000))
+
+FAST_SERIALIZATION = os.getenv('FAST_SERIALIZATION', 'True') == 'True'
+
+LEADERBOARD = {
+    'MIN_REVIEWS': int(os.getenv('LEADERBOARD_MIN_REVIEWS', 3)),
+    'PRIOR_WEIGHT': int(os.getenv('LEADERBOARD_PRIOR_WEIGHT', 10)),
+}
+
+TITLE_SEARCH = {
+    'CONFIG': os.getenv('TITLE_SEARCH_CONFIG', 'simple'),
+    'INCLUDE_REVIEWS': False,
+}
+
+CONFIRMATION_CODE_LIFETIME = timedelta(hours=24)
+
+AUTH_USER_CACHE = {
+    'BACKEND': os.getenv(
+        'AUTH_USER_CACHE_BACKEND', 'auths.cache.DjangoUserCache'
+    ),
+    'TIMEOUT': int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60)),
+    'MAX_SIZE': 10000,
+    'CACHE_ALIAS': 'shared',
+}
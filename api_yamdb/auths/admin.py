@@ -1,4 +1,14 @@
 from django.contrib import admin
 from users.models import User
 
+from .models import OutboundEmail
+
 admin.site.register(User)
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'status', 'attempts',
+                    'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient',)
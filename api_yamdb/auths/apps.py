@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AuthsConfig(AppConfig):
     name = 'auths'
+
+    def ready(self):
+        from . import signals  # noqa: F401
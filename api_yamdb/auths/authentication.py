@@ -4,10 +4,15 @@ from rest_framework import authentication, exceptions
 from rest_framework.authentication import get_authorization_header
 from users.models import User
 
+from api_yamdb.metrics import timed
+
+from .cache import get_user_cache
+
 
 class JWTAuthentication(authentication.BaseAuthentication):
     """Класс авторицаяя пользователя по токену."""
 
+    @timed('JWTAuthentication.authenticate')
     def authenticate(self, request):
         CORRECT_AUTH_HEADER_LENGTH = 2
         auth = get_authorization_header(request).split()
@@ -23,20 +28,27 @@ class JWTAuthentication(authentication.BaseAuthentication):
         return self.authenticate_credentials(request, token)
 
     def authenticate_credentials(self, request, token):
-        try:
-            payload = jwt.decode(
-                jwt=token,
-                key=settings.SECRET_KEY,
-                algorithms=[settings.SIMPLE_JWT.get('ALGORITHM')]
-            )
-        except Exception:
-            raise exceptions.AuthenticationFailed('Wrong token')
+        cache = get_user_cache()
+        payload = cache.get_payload(token)
+        if payload is None:
+            try:
+                payload = jwt.decode(
+                    jwt=token,
+                    key=settings.SECRET_KEY,
+                    algorithms=[settings.SIMPLE_JWT.get('ALGORITHM')]
+                )
+            except Exception:
+                raise exceptions.AuthenticationFailed('Wrong token')
+            cache.set_payload(token, payload)
         user_id = payload.get('user_id') or payload.get('id')
-        try:
-            user = User.objects.get(pk=user_id)
-        except User.DoesNotExist:
-            message = 'User does not exist Check Token.'
-            raise exceptions.AuthenticationFailed(message)
+        user = cache.get_user(user_id)
+        if user is None:
+            try:
+                user = User.objects.get(pk=user_id)
+            except User.DoesNotExist:
+                message = 'User does not exist Check Token.'
+                raise exceptions.AuthenticationFailed(message)
+            cache.set_user(user)
         if not user.is_active:
             message = 'User deactivated.'
             raise exceptions.AuthenticationFailed(message)
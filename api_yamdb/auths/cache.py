@@ -0,0 +1,141 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+DEFAULT_SETTINGS = {
+    'BACKEND': 'auths.cache.DjangoUserCache',
+    'TIMEOUT': 60,
+    'MAX_SIZE': 10000,
+    'CACHE_ALIAS': 'shared',
+}
+
+
+class BaseUserCache:
+    """
+    Кэш пользователей и расшифрованных токенов для JWTAuthentication.
+
+    Пользователь хранится по первичному ключу, полезная нагрузка токена -
+    по хэшу самого токена и не дольше, чем до момента `exp`.
+    """
+
+    def __init__(self, timeout, **options):
+        self.timeout = timeout
+
+    def get_user(self, user_id):
+        return self._get(f'user:{user_id}')
+
+    def set_user(self, user):
+        self._set(f'user:{user.pk}', user, self.timeout)
+
+    def invalidate(self, user_id):
+        self._delete(f'user:{user_id}')
+
+    def get_payload(self, token):
+        return self._get(self._token_key(token))
+
+    def set_payload(self, token, payload):
+        timeout = self.timeout
+        if payload.get('exp') is not None:
+            timeout = min(timeout, payload['exp'] - time.time())
+        if timeout > 0:
+            self._set(self._token_key(token), payload, timeout)
+
+    @staticmethod
+    def _token_key(token):
+        return 'token:' + hashlib.sha256(token.encode()).hexdigest()
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, value, timeout):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        raise NotImplementedError
+
+
+class LocMemUserCache(BaseUserCache):
+    """
+    Ограниченный по размеру LRU-кэш в памяти процесса.
+
+    Инвалидация видна только текущему процессу, остальные воркеры
+    получат изменения (смену роли, блокировку) по истечении
+    TIMEOUT, поэтому он не дольше MAX_TIMEOUT секунд. Включается
+    явно, для одного процесса.
+    """
+
+    MAX_TIMEOUT = 5
+
+    def __init__(self, timeout, max_size=10000, **options):
+        super().__init__(min(timeout, self.MAX_TIMEOUT), **options)
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return copy.copy(value)
+
+    def _set(self, key, value, timeout):
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def _delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DjangoUserCache(BaseUserCache):
+    """Кэш поверх общего для всех воркеров бэкенда из CACHES."""
+
+    key_prefix = 'jwt-auth'
+
+    def __init__(self, timeout, cache_alias='shared', **options):
+        super().__init__(timeout, **options)
+        self.cache = caches[cache_alias]
+
+    def _get(self, key):
+        return self.cache.get(f'{self.key_prefix}:{key}')
+
+    def _set(self, key, value, timeout):
+        self.cache.set(f'{self.key_prefix}:{key}', value, timeout)
+
+    def _delete(self, key):
+        self.cache.delete(f'{self.key_prefix}:{key}')
+
+
+@lru_cache(maxsize=None)
+def get_user_cache():
+    """Возвращает кэш, настроенный в settings.AUTH_USER_CACHE."""
+    options = {
+        **DEFAULT_SETTINGS,
+        **getattr(settings, 'AUTH_USER_CACHE', {})
+    }
+    backend = import_string(options['BACKEND'])
+    return backend(
+        timeout=options['TIMEOUT'],
+        max_size=options['MAX_SIZE'],
+        cache_alias=options['CACHE_ALIAS'],
+    )
@@ -0,0 +1,138 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+DEFAULT_SETTINGS = {
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 30,
+    'MAX_RETRY_DELAY': 3600,
+    'KEEP_SENT': 7,
+    'KEEP_DEAD': 1,
+}
+
+
+def get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'MAIL_QUEUE', {})}
+
+
+def enqueue_mail(subject, body, recipient, from_email=None):
+    """Поставить письмо в очередь вместо отправки внутри запроса."""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        recipient=recipient,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+
+
+def retry_delay(attempts, options):
+    delay = options['RETRY_DELAY'] * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, options['MAX_RETRY_DELAY']))
+
+
+def fail(email, error, options):
+    """
+    Отложить письмо с экспоненциальной задержкой или перевести в dead.
+
+    Текст dead-письма сохраняется, чтобы его можно было разобрать
+    или отправить заново; удаляет такие письма purge_dead.
+    """
+    email.last_error = f'{error.__class__.__name__}: {error}'
+    if email.attempts >= options['MAX_ATTEMPTS']:
+        email.status = OutboundEmail.DEAD
+    else:
+        email.next_attempt_at = (
+            timezone.now() + retry_delay(email.attempts, options)
+        )
+
+
+def send_batch(batch_size=None, connection=None):
+    """
+    Отправить очередную пачку писем через одно SMTP-соединение.
+
+    Письма выбираются с SKIP LOCKED, поэтому несколько воркеров
+    не отправят одно письмо дважды. Неудачные попытки откладываются
+    с экспоненциальной задержкой, после MAX_ATTEMPTS письмо
+    переводится в статус dead. Если не удалось открыть соединение,
+    откладывается вся пачка. Текст отправленного письма стирается:
+    в нём код подтверждения.
+    Возвращает пару (отправлено, ошибок).
+    """
+    options = get_settings()
+    batch_size = batch_size or options['BATCH_SIZE']
+    sent = failed = 0
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.PENDING,
+                    next_attempt_at__lte=timezone.now())[:batch_size]
+        )
+        if not batch:
+            return sent, failed
+        for email in batch:
+            email.attempts += 1
+        try:
+            connection = connection or get_connection()
+            connection.open()
+        except Exception as error:
+            for email in batch:
+                fail(email, error, options)
+            failed = len(batch)
+        else:
+            try:
+                for email in batch:
+                    message = EmailMessage(
+                        email.subject, email.body, email.from_email,
+                        [email.recipient], connection=connection
+                    )
+                    try:
+                        message.send()
+                    except Exception as error:
+                        failed += 1
+                        fail(email, error, options)
+                    else:
+                        sent += 1
+                        email.status = OutboundEmail.SENT
+                        email.sent_at = timezone.now()
+                        email.body = ''
+            finally:
+                connection.close()
+        OutboundEmail.objects.bulk_update(
+            batch,
+            ['status', 'attempts', 'next_attempt_at', 'last_error',
+             'sent_at', 'body']
+        )
+    return sent, failed
+
+
+def purge_sent(keep_days=None):
+    """Удалить отправленные письма старше KEEP_SENT дней."""
+    if keep_days is None:
+        keep_days = get_settings()['KEEP_SENT']
+    deleted, _ = OutboundEmail.objects.filter(
+        status=OutboundEmail.SENT,
+        sent_at__lt=timezone.now() - timedelta(days=keep_days)
+    ).delete()
+    return deleted
+
+
+def purge_dead(keep_days=None):
+    """
+    Удалить dead-письма старше KEEP_DEAD дней.
+
+    По умолчанию - сутки, срок жизни кода подтверждения:
+    после него текст письма уже бесполезен.
+    """
+    if keep_days is None:
+        keep_days = get_settings()['KEEP_DEAD']
+    deleted, _ = OutboundEmail.objects.filter(
+        status=OutboundEmail.DEAD,
+        created__lt=timezone.now() - timedelta(days=keep_days)
+    ).delete()
+    return deleted
@@ -0,0 +1,64 @@
+import logging
+import sys
+import time
+
+from auths.mail import purge_dead, purge_sent, send_batch
+from django.core.management import BaseCommand
+from django.db import close_old_connections
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+logger = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stdout)
+stream_handler.setLevel(logging.INFO)
+stream_handler.setFormatter(
+    logging.Formatter(LOG_FORMAT)
+)
+
+
+logger.addHandler(stream_handler)
+logger.setLevel(logging.INFO)
+
+
+class Command(BaseCommand):
+    """Воркер, разбирающий очередь исходящих писем."""
+
+    help = 'Отправка писем из очереди OutboundEmail.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Сколько писем отправлять за одну SMTP-сессию.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, а не до опустошения очереди.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=2.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = send_batch(options['batch_size'])
+                if not (sent or failed):
+                    purged = purge_sent()
+                    if purged:
+                        logger.info(f'Удалено отправленных писем: {purged}')
+                    purged = purge_dead()
+                    if purged:
+                        logger.info(f'Удалено dead-писем: {purged}')
+            except Exception:
+                if not options['loop']:
+                    raise
+                logger.exception('Ошибка при разборе очереди писем')
+                close_old_connections()
+                time.sleep(options['interval'])
+                continue
+            if sent or failed:
+                logger.info(f'Отправлено писем: {sent}, ошибок: {failed}')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,136 @@
+from django.conf import settings
+from django.contrib.auth.base_user import BaseUserManager
+from django.db import models
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+
+class OutboundEmail(models.Model):
+    """Письмо в очереди на отправку."""
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    DEAD = 'dead'
+
+    STATUSES = [
+        (PENDING, 'pending'),
+        (SENT, 'sent'),
+        (DEAD, 'dead'),
+    ]
+
+    subject = models.CharField(max_length=255, verbose_name='тема')
+    body = models.TextField(verbose_name='текст')
+    from_email = models.CharField(
+        max_length=254,
+        verbose_name='отправитель'
+    )
+    recipient = models.EmailField(verbose_name='получатель')
+    status = models.CharField(
+        choices=STATUSES,
+        default=PENDING,
+        max_length=15,
+        verbose_name='статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='попыток отправки'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='следующая попытка'
+    )
+    last_error = models.TextField(blank=True, verbose_name='последняя ошибка')
+    created = models.DateTimeField(auto_now_add=True, verbose_name='создано')
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='отправлено'
+    )
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ['next_attempt_at', 'id']
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outbox_status_next_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
+
+
+class ConfirmationCode(models.Model):
+    """
+    Одноразовый код подтверждения для получения токена.
+
+    Код хранится как HMAC от SECRET_KEY, а не в User.password:
+    это короткоживущий токен, и PBKDF2 для него не нужен.
+    """
+
+    KEY_SALT = 'auths.ConfirmationCode'
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='confirmation_code',
+        verbose_name='пользователь'
+    )
+    digest = models.CharField(max_length=64, verbose_name='HMAC кода')
+    expires_at = models.DateTimeField(verbose_name='действует до')
+    used_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='использован'
+    )
+
+    class Meta:
+        verbose_name = 'Код подтверждения'
+        verbose_name_plural = 'Коды подтверждения'
+
+    def __str__(self):
+        return f'{self.user_id}: {self.expires_at}'
+
+    @classmethod
+    def make_digest(cls, user_id, code):
+        return salted_hmac(cls.KEY_SALT, f'{user_id}:{code}').hexdigest()
+
+    @classmethod
+    def issue(cls, user):
+        """Выпустить новый код взамен прежнего и вернуть его открытым."""
+        code = BaseUserManager().make_random_password()
+        cls.objects.update_or_create(
+            user=user,
+            defaults={
+                'digest': cls.make_digest(user.pk, code),
+                'expires_at': (timezone.now()
+                               + settings.CONFIRMATION_CODE_LIFETIME),
+                'used_at': None,
+            }
+        )
+        return code
+
+    @classmethod
+    def redeem(cls, username, code):
+        """
+        Проверить код и погасить его.
+
+        Возвращает пользователя или None, если кода нет, он неверный,
+        просрочен или уже использован. Гашение - условный UPDATE,
+        поэтому код нельзя использовать дважды даже параллельно.
+        """
+        confirmation = cls.objects.select_related('user').filter(
+            user__username=username,
+            used_at=None,
+            expires_at__gt=timezone.now(),
+        ).first()
+        if confirmation is None or not constant_time_compare(
+            confirmation.digest, cls.make_digest(confirmation.user_id, code)
+        ):
+            return None
+        redeemed = cls.objects.filter(
+            pk=confirmation.pk, used_at=None
+        ).update(used_at=timezone.now())
+        return confirmation.user if redeemed else None
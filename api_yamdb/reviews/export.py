@@ -0,0 +1,162 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from .models import Comment, GenreTitle, Review, Title
+
+CHUNK_SIZE = 2000
+OUTPUTS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class Dataset:
+    """
+    Набор строк для выгрузки: поля values_list и порядок водяного знака.
+
+    Строки отдаются в порядке (pub_date, id) или (id), поэтому последняя
+    выгруженная строка - водяной знак для следующей инкрементальной
+    выгрузки (`since` и `after_id`).
+    """
+
+    model = None
+    fields = ()
+    watermark = ('id',)
+
+    def get_queryset(self, since=None, after_id=None):
+        queryset = self.model.objects.order_by(*self.watermark)
+        if 'pub_date' in self.watermark and since is not None:
+            queryset = queryset.filter(
+                Q(pub_date__gt=since)
+                | Q(pub_date=since, id__gt=after_id or 0)
+            )
+        elif after_id is not None:
+            queryset = queryset.filter(id__gt=after_id)
+        return queryset
+
+    @property
+    def columns(self):
+        return [name for name, _ in self.fields]
+
+    def iter_rows(self, since=None, after_id=None, chunk_size=CHUNK_SIZE):
+        """Строки-словари по серверному курсору, память не растёт."""
+        rows = self.get_queryset(since, after_id).values_list(
+            *[lookup for _, lookup in self.fields]
+        ).iterator(chunk_size=chunk_size)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield from self.to_dicts(chunk)
+
+    def to_dicts(self, chunk):
+        return [dict(zip(self.columns, row)) for row in chunk]
+
+
+class TitleDataset(Dataset):
+    """Произведения; жанры пачки добираются одним запросом."""
+
+    model = Title
+    fields = (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('year', 'year'),
+        ('description', 'description'),
+        ('category', 'category__slug'),
+        ('rating', 'rating'),
+        ('reviews_count', 'reviews_count'),
+    )
+
+    @property
+    def columns(self):
+        return super().columns + ['genre']
+
+    def to_dicts(self, chunk):
+        genres = defaultdict(list)
+        for title_id, slug in GenreTitle.objects.filter(
+            title_id__in=[row[0] for row in chunk]
+        ).order_by('genre__slug').values_list('title_id', 'genre__slug'):
+            genres[title_id].append(slug)
+        rows = super().to_dicts(chunk)
+        for row in rows:
+            row['genre'] = genres[row['id']]
+        return rows
+
+
+class ReviewDataset(Dataset):
+    model = Review
+    fields = (
+        ('id', 'id'),
+        ('title', 'title_id'),
+        ('author', 'author__username'),
+        ('text', 'text'),
+        ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    )
+    watermark = ('pub_date', 'id')
+
+
+class CommentDataset(Dataset):
+    model = Comment
+    fields = (
+        ('id', 'id'),
+        ('review', 'review_id'),
+        ('title', 'review__title_id'),
+        ('author', 'author__username'),
+        ('text', 'text'),
+        ('pub_date', 'pub_date'),
+    )
+    watermark = ('pub_date', 'id')
+
+
+DATASETS = {
+    'titles': TitleDataset(),
+    'reviews': ReviewDataset(),
+    'comments': CommentDataset(),
+}
+
+
+def iter_ndjson(dataset, rows):
+    for row in rows:
+        yield json.dumps(
+            row, cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
+
+
+def iter_csv(dataset, rows, chunk_size=CHUNK_SIZE):
+    """CSV пачками строк; списки (жанры) пишутся через запятую."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=dataset.columns)
+    writer.writeheader()
+    written = 0
+    for row in rows:
+        writer.writerow({
+            key: ','.join(value) if isinstance(value, list) else value
+            for key, value in row.items()
+        })
+        written += 1
+        if written % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+FORMATTERS = {
+    'ndjson': iter_ndjson,
+    'csv': iter_csv,
+}
+
+
+def export(name, output='ndjson', since=None, after_id=None,
+           chunk_size=CHUNK_SIZE):
+    """Итератор строк выгрузки набора `name` в формате `output`."""
+    dataset = DATASETS[name]
+    rows = dataset.iter_rows(since, after_id, chunk_size)
+    return FORMATTERS[output](dataset, rows)
@@ -0,0 +1,126 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+
+from .models import RankingPrior, Title, TitleRanking
+
+PRIOR_CACHE_KEY = 'leaderboard:prior'
+
+DEFAULT_SETTINGS = {
+    'MIN_REVIEWS': 3,
+    'PRIOR_WEIGHT': 10,
+    'PRIOR_TIMEOUT': 300,
+    'DEFAULT_PRIOR': 5.5,
+}
+
+
+def get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'LEADERBOARD', {})}
+
+
+def prior_mean():
+    """
+    Средняя оценка по всем отзывам - к ней тянутся малые выборки.
+
+    Запись отзыва не агрегирует всю таблицу: берётся значение,
+    сохранённое последним полным пересчётом (из общего кэша или
+    из RankingPrior), а до первого пересчёта - DEFAULT_PRIOR.
+    """
+    cache = caches['shared']
+    mean = cache.get(PRIOR_CACHE_KEY)
+    if mean is None:
+        mean = RankingPrior.objects.values_list('mean', flat=True).first()
+        if mean is None:
+            return get_settings()['DEFAULT_PRIOR']
+        cache.set(PRIOR_CACHE_KEY, mean, get_settings()['PRIOR_TIMEOUT'])
+    return mean
+
+
+def store_prior():
+    """Пересчитать среднюю оценку по всем отзывам и сохранить её."""
+    totals = Title.objects.aggregate(
+        total=Sum('score_sum'), count=Sum('reviews_count')
+    )
+    if not totals['count']:
+        return get_settings()['DEFAULT_PRIOR']
+    mean = totals['total'] / totals['count']
+    RankingPrior.objects.update_or_create(
+        pk=1, defaults={'mean': mean, 'reviews_count': totals['count']}
+    )
+    transaction.on_commit(lambda: caches['shared'].set(
+        PRIOR_CACHE_KEY, mean, get_settings()['PRIOR_TIMEOUT']
+    ))
+    return mean
+
+
+def bayesian_score(score_sum, reviews_count, prior, weight):
+    """Среднее с PRIOR_WEIGHT воображаемыми отзывами на оценку prior."""
+    return (weight * prior + score_sum) / (weight + reviews_count)
+
+
+def refresh_titles(title_ids):
+    """
+    Обновить места произведений после записи их отзывов.
+
+    Вызывается в транзакции записи, после сдвига счётчиков
+    в Title. Произведения с числом отзывов меньше MIN_REVIEWS
+    из рейтинга удаляются.
+    """
+    options = get_settings()
+    prior = prior_mean()
+    ranked = Title.objects.filter(
+        pk__in=title_ids, reviews_count__gte=options['MIN_REVIEWS']
+    ).order_by().values_list('pk', 'reviews_count', 'score_sum')
+    kept = set()
+    for title_id, reviews_count, score_sum in ranked:
+        kept.add(title_id)
+        values = {
+            'score': bayesian_score(score_sum, reviews_count, prior,
+                                    options['PRIOR_WEIGHT']),
+            'reviews_count': reviews_count,
+        }
+        if TitleRanking.objects.filter(title_id=title_id).update(**values):
+            continue
+        try:
+            with transaction.atomic():
+                TitleRanking.objects.create(title_id=title_id, **values)
+        except IntegrityError:
+            TitleRanking.objects.filter(title_id=title_id).update(**values)
+    dropped = set(title_ids) - kept
+    if dropped:
+        TitleRanking.objects.filter(title_id__in=dropped).delete()
+
+
+def rebuild():
+    """Пересчитать рейтинг целиком, заново вычислив среднюю оценку."""
+    options = get_settings()
+    prior = store_prior()
+    titles = Title.objects.filter(
+        reviews_count__gte=options['MIN_REVIEWS']
+    ).order_by().values_list('pk', 'reviews_count', 'score_sum')
+    TitleRanking.objects.all().delete()
+    TitleRanking.objects.bulk_create(
+        (TitleRanking(
+            title_id=title_id,
+            reviews_count=reviews_count,
+            score=bayesian_score(score_sum, reviews_count, prior,
+                                 options['PRIOR_WEIGHT'])
+        ) for title_id, reviews_count, score_sum in titles.iterator()),
+        batch_size=1000
+    )
+    return TitleRanking.objects.count()
+
+
+def ranking(genre=None, category=None, year=None):
+    """Рейтинг, при необходимости по жанру, категории или году."""
+    queryset = TitleRanking.objects.select_related('title').order_by(
+        '-score', '-reviews_count', 'title_id'
+    )
+    if genre is not None:
+        queryset = queryset.filter(title__genre=genre)
+    if category is not None:
+        queryset = queryset.filter(title__category=category)
+    if year is not None:
+        queryset = queryset.filter(title__year=year)
+    return queryset
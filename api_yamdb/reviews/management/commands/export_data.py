@@ -0,0 +1,73 @@
+import logging
+import sys
+
+from django.core.management import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from reviews.export import CHUNK_SIZE, DATASETS, OUTPUTS, export
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+logger = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stderr)
+stream_handler.setLevel(logging.INFO)
+stream_handler.setFormatter(
+    logging.Formatter(LOG_FORMAT)
+)
+
+
+logger.addHandler(stream_handler)
+logger.setLevel(logging.INFO)
+
+
+class Command(BaseCommand):
+    """Потоковая выгрузка набора данных в NDJSON или CSV."""
+
+    help = 'Выгрузка произведений, отзывов или комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(DATASETS))
+        parser.add_argument(
+            '--output', choices=list(OUTPUTS), default='ndjson',
+            help='Формат выгрузки.'
+        )
+        parser.add_argument(
+            '--file', default=None,
+            help='Файл для выгрузки (по умолчанию stdout).'
+        )
+        parser.add_argument(
+            '--since', default=None,
+            help='Выгрузить строки с pub_date не раньше этой даты (ISO 8601).'
+        )
+        parser.add_argument(
+            '--after-id', type=int, default=None,
+            help='Вместе с --since: пропустить строки с той же датой '
+                 'и id не больше этого; без него - строки с большим id.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Сколько строк читать из курсора за раз.'
+        )
+
+    def handle(self, *args, **options):
+        since = options['since']
+        if since is not None:
+            since = parse_datetime(since)
+            if since is None:
+                raise CommandError('--since: ожидается дата в ISO 8601.')
+        chunks = export(
+            options['dataset'], options['output'], since,
+            options['after_id'], options['chunk_size']
+        )
+        if options['file']:
+            with open(options['file'], 'w', encoding='utf-8',
+                      newline='') as target:
+                self.write(chunks, target.write)
+        else:
+            self.write(
+                chunks, lambda chunk: self.stdout.write(chunk, ending='')
+            )
+
+    @staticmethod
+    def write(chunks, write):
+        for chunk in chunks:
+            write(chunk)
+        logger.info('Выгрузка завершена.')
@@ -0,0 +1,186 @@
+import logging
+import random
+import sys
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from reviews.leaderboard import rebuild as rebuild_leaderboards
+from reviews.management.commands.load_data import keep_auto_now_add
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, User, VersionStamp)
+from reviews.search import rebuild_index
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+logger = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stdout)
+stream_handler.setLevel(logging.INFO)
+stream_handler.setFormatter(
+    logging.Formatter(LOG_FORMAT)
+)
+
+
+logger.addHandler(stream_handler)
+logger.setLevel(logging.INFO)
+
+WORDS = (
+    'ночь', 'город', 'море', 'ветер', 'память', 'дорога', 'сад', 'огонь',
+    'зима', 'тень', 'песня', 'остров', 'звезда', 'дом', 'река', 'время',
+    'война', 'мир', 'сон', 'небо', 'лес', 'письмо', 'голос', 'свет',
+)
+
+
+def zipf_counts(total, buckets, exponent, cap):
+    """
+    Распределить total по buckets корзинам по закону Ципфа.
+
+    Корзина ранга k получает долю 1/k^exponent, но не больше cap -
+    отзывов у произведения не больше, чем пользователей.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, buckets + 1)]
+    scale = total / sum(weights)
+    return [min(cap, round(weight * scale)) for weight in weights]
+
+
+def sentence(rng, words=8):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def random_date(rng, now, days=3 * 365):
+    return now - timedelta(seconds=rng.randrange(days * 24 * 3600))
+
+
+class Command(BaseCommand):
+    """Генерация синтетического набора данных для нагрузочных тестов."""
+
+    help = 'Генерация пользователей, произведений, отзывов и комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--titles', type=int, default=2000)
+        parser.add_argument(
+            '--reviews', type=int, default=50000,
+            help='Сколько всего отзывов; по произведениям - по Ципфу.'
+        )
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель распределения Ципфа для отзывов.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--prefix', default='load',
+            help='Префикс имён пользователей, слагов жанров и категорий.'
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['titles'] < 1:
+            raise CommandError('Нужен хотя бы один пользователь '
+                               'и одно произведение.')
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        prefix = options['prefix']
+        with transaction.atomic():
+            users = self.create_users(prefix, options['users'])
+            categories = self.create(Category, (
+                Category(name=f'Категория {number}',
+                         slug=f'{prefix}-category-{number}')
+                for number in range(options['categories'])
+            ))
+            genres = self.create(Genre, (
+                Genre(name=f'Жанр {number}', slug=f'{prefix}-genre-{number}')
+                for number in range(options['genres'])
+            ))
+            titles = self.create_titles(options['titles'], categories, genres)
+            reviews = self.create_reviews(
+                titles, users, options['reviews'], options['zipf']
+            )
+            self.create_comments(reviews, users, options['comments'])
+            logger.info('Пересчёт рейтингов и поискового индекса...')
+            Title.rebuild_ratings()
+            rebuild_leaderboards()
+            rebuild_index()
+            for scope in ('titles', 'genres', 'categories'):
+                VersionStamp.bump(scope)
+        logger.info('Готово.')
+
+    def create(self, model, objects):
+        """bulk_create пачками; id новых строк - запросом после вставки."""
+        last = model.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+        created = 0
+        with keep_auto_now_add(model):
+            while True:
+                batch = list(islice(objects, self.batch_size))
+                if not batch:
+                    break
+                model.objects.bulk_create(batch)
+                created += len(batch)
+        logger.info(f'{model.__name__}: {created}')
+        return list(model.objects.filter(id__gt=last).order_by(
+            'id'
+        ).values_list('id', flat=True))
+
+    def create_users(self, prefix, amount):
+        password = make_password(None)
+        return self.create(User, (
+            User(username=f'{prefix}{number}',
+                 email=f'{prefix}{number}@yamdb.fake', password=password)
+            for number in range(amount)
+        ))
+
+    def create_titles(self, amount, categories, genres):
+        rng = self.rng
+        titles = self.create(Title, (
+            Title(
+                name=sentence(rng, rng.randint(1, 4)),
+                year=rng.randint(1950, self.now.year),
+                description=sentence(rng, 20),
+                category_id=rng.choice(categories) if categories else None,
+            )
+            for _ in range(amount)
+        ))
+        if genres:
+            self.create(GenreTitle, (
+                GenreTitle(title_id=title_id, genre_id=genre_id)
+                for title_id in titles
+                for genre_id in rng.sample(
+                    genres, rng.randint(1, min(3, len(genres)))
+                )
+            ))
+        return titles
+
+    def create_reviews(self, titles, users, amount, exponent):
+        rng = self.rng
+        ranked = titles[:]
+        rng.shuffle(ranked)
+        counts = zipf_counts(amount, len(ranked), exponent, len(users))
+        return self.create(Review, (
+            Review(
+                title_id=title_id, author_id=author_id,
+                text=sentence(rng, 30), score=rng.randint(1, 10),
+                pub_date=random_date(rng, self.now),
+            )
+            for title_id, count in zip(ranked, counts)
+            for author_id in rng.sample(users, count)
+        ))
+
+    def create_comments(self, reviews, users, amount):
+        if not reviews:
+            return
+        rng = self.rng
+        self.create(Comment, (
+            Comment(
+                review_id=rng.choice(reviews), author_id=rng.choice(users),
+                text=sentence(rng, 12), pub_date=random_date(rng, self.now),
+            )
+            for _ in range(amount)
+        ))
@@ -1,9 +1,19 @@
 import logging
+import os
 import sys
+import time
+from contextlib import contextmanager
 from csv import DictReader
+from itertools import islice
 
-from django.core.management import BaseCommand
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from reviews.leaderboard import rebuild as rebuild_leaderboards
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, User, VersionStamp)
+from reviews.search import rebuild_index
 
 LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
 logger = logging.getLogger(__name__)
@@ -18,25 +28,156 @@ logger.addHandler(stream_handler)
 logger.setLevel(logging.INFO)
 
 
-files_to_download = {User: 'static/data/users.csv',
-                     Category: 'static/data/category.csv',
-                     Genre: 'static/data/genre.csv',
-                     Title: 'static/data/titles.csv',
-                     Review: 'static/data/review.csv',
-                     Comment: 'static/data/comments.csv',
+files_to_download = {'users': (User, 'static/data/users.csv'),
+                     'category': (Category, 'static/data/category.csv'),
+                     'genre': (Genre, 'static/data/genre.csv'),
+                     'titles': (Title, 'static/data/titles.csv'),
+                     'genre_title': (GenreTitle,
+                                     'static/data/genre_title.csv'),
+                     'review': (Review, 'static/data/review.csv'),
+                     'comments': (Comment, 'static/data/comments.csv'),
                      }
 
 
+def get_columns(model, header):
+    """Сопоставляет колонки csv с атрибутами модели.
+
+    Внешние ключи в файлах записаны как `author` или `category`,
+    их значения - это первичные ключи, поэтому пишем их в `*_id`.
+    """
+    columns = []
+    for name in header:
+        field = model._meta.get_field(name)
+        columns.append((name, field.attname, field.is_relation))
+    return columns
+
+
+def read_objects(model, path, encoding):
+    """Лениво читает csv и отдаёт несохранённые объекты модели."""
+    with open(path, encoding=encoding, newline='') as csv_file:
+        reader = DictReader(csv_file)
+        columns = get_columns(model, reader.fieldnames)
+        for row in reader:
+            yield model(**{
+                attname: (row[name] or None) if is_relation else row[name]
+                for name, attname, is_relation in columns
+            })
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Не даёт auto_now_add затереть даты из файла при bulk_create."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
 class Command(BaseCommand):
     """Класс реализует загрузку данных из csv в таблицы моделей проекта."""
 
     help = 'Загрузка данных из .csv в модели проекта.'
 
-    def handle(self, *args, **options):
-        for model, file in files_to_download.items():
-            logger.info(f'Загрузка данных из файла {file} в модель {model}...')
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--models', nargs='+', choices=list(files_to_download),
+            default=list(files_to_download),
+            help='Какие файлы загружать (по умолчанию все).'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Сколько строк вставлять одним bulk_create.'
+        )
+        parser.add_argument(
+            '--truncate', action='store_true',
+            help=('Очистить таблицы выбранных моделей перед загрузкой. '
+                  'Зависимые таблицы нужно выбрать тоже.')
+        )
+        parser.add_argument(
+            '--progress', type=int, default=100000,
+            help='Писать прогресс каждые N строк (0 - не писать).'
+        )
+        parser.add_argument(
+            '--encoding', default='cp1251',
+            help='Кодировка csv-файлов.'
+        )
+        parser.add_argument(
+            '--data-dir', default=None,
+            help='Каталог с csv вместо static/data.'
+        )
 
-            for row in DictReader(open(f'./{file}')):
-                obj = model.objects.create(**row)
-                obj.save()
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        selected = [
+            name for name in files_to_download if name in options['models']
+        ]
+        if options['truncate']:
+            self.truncate([files_to_download[name][0]
+                           for name in reversed(selected)])
+        for name in selected:
+            model, file = files_to_download[name]
+            if options['data_dir']:
+                file = os.path.join(options['data_dir'],
+                                    os.path.basename(file))
+            logger.info(f'Загрузка данных из файла {file} '
+                        f'в модель {model.__name__}...')
+            self.load(model, os.path.join(settings.BASE_DIR, file), options)
+        if 'review' in selected:
+            logger.info('Пересчёт рейтингов произведений...')
+            Title.rebuild_ratings()
+            rebuild_leaderboards()
+        if 'titles' in selected or 'review' in selected:
+            logger.info('Перестроение поискового индекса...')
+            rebuild_index()
+        for scope in ('titles', 'genres', 'categories'):
+            VersionStamp.bump(scope)
         logger.info('Загрузка данных завершена!')
+
+    def truncate(self, models):
+        tables = [model._meta.db_table for model in models]
+        logger.info(f'Очистка таблиц: {", ".join(tables)}')
+        sequences = [{'table': table, 'column': 'id'} for table in tables]
+        statements = connection.ops.sql_flush(no_style(), tables, sequences)
+        with transaction.atomic(), connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def load(self, model, path, options):
+        batch_size = options['batch_size']
+        progress = options['progress']
+        objects = read_objects(model, path, options['encoding'])
+        loaded = 0
+        started = time.monotonic()
+        with transaction.atomic(), keep_auto_now_add(model):
+            while True:
+                batch = list(islice(objects, batch_size))
+                if not batch:
+                    break
+                model.objects.bulk_create(batch, batch_size=batch_size)
+                previous, loaded = loaded, loaded + len(batch)
+                if progress and loaded // progress > previous // progress:
+                    self.report(model, loaded, started)
+            self.reset_sequences(model)
+        self.report(model, loaded, started)
+
+    @staticmethod
+    def reset_sequences(model):
+        statements = connection.ops.sequence_reset_sql(no_style(), [model])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    @staticmethod
+    def report(model, loaded, started):
+        elapsed = time.monotonic() - started
+        rate = loaded / elapsed if elapsed else loaded
+        logger.info(f'{model.__name__}: {loaded} строк, '
+                    f'{elapsed:.1f} с, {rate:.0f} строк/с')
@@ -0,0 +1,30 @@
+import logging
+import sys
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from reviews.models import Title
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+logger = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stdout)
+stream_handler.setLevel(logging.INFO)
+stream_handler.setFormatter(
+    logging.Formatter(LOG_FORMAT)
+)
+
+
+logger.addHandler(stream_handler)
+logger.setLevel(logging.INFO)
+
+
+class Command(BaseCommand):
+    """Пересчёт сохранённых рейтингов произведений с нуля."""
+
+    help = 'Пересчёт рейтинга, суммы и количества оценок произведений.'
+
+    def handle(self, *args, **options):
+        logger.info('Пересчёт рейтингов произведений...')
+        with transaction.atomic():
+            updated = Title.rebuild_ratings()
+        logger.info(f'Пересчитано произведений: {updated}')
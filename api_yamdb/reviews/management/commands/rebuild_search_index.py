@@ -0,0 +1,30 @@
+import logging
+import sys
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from reviews.search import rebuild_index
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+logger = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stdout)
+stream_handler.setLevel(logging.INFO)
+stream_handler.setFormatter(
+    logging.Formatter(LOG_FORMAT)
+)
+
+
+logger.addHandler(stream_handler)
+logger.setLevel(logging.INFO)
+
+
+class Command(BaseCommand):
+    """Полная перестройка полнотекстового индекса произведений."""
+
+    help = 'Перестроение поискового индекса произведений.'
+
+    def handle(self, *args, **options):
+        logger.info('Перестроение поискового индекса...')
+        with transaction.atomic():
+            rebuild_index()
+        logger.info('Поисковый индекс перестроен.')
@@ -0,0 +1,36 @@
+import logging
+import sys
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from reviews.leaderboard import rebuild
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+logger = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stdout)
+stream_handler.setLevel(logging.INFO)
+stream_handler.setFormatter(
+    logging.Formatter(LOG_FORMAT)
+)
+
+
+logger.addHandler(stream_handler)
+logger.setLevel(logging.INFO)
+
+
+class Command(BaseCommand):
+    """
+    Полный пересчёт рейтинга лучших произведений.
+
+    Между запусками рейтинг обновляется при записи отзывов, но
+    средняя оценка по всем отзывам, к которой тянутся малые выборки,
+    пересчитывается только здесь - команду стоит запускать по cron.
+    """
+
+    help = 'Пересчёт рейтингов лучших произведений.'
+
+    def handle(self, *args, **options):
+        logger.info('Пересчёт рейтинга произведений...')
+        with transaction.atomic():
+            ranked = rebuild()
+        logger.info(f'Рейтинг пересчитан: {ranked} произведений.')
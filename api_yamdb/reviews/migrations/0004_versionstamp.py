@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:56
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_pub_date_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionStamp',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=32, verbose_name='коллекция')),
+                ('object_key', models.CharField(blank=True, default='', max_length=64, verbose_name='ключ объекта')),
+                ('version', models.PositiveIntegerField(default=1, verbose_name='версия')),
+                ('modified', models.DateTimeField(default=django.utils.timezone.now, verbose_name='время изменения')),
+            ],
+            options={
+                'verbose_name': 'Версия данных',
+                'verbose_name_plural': 'Версии данных',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='versionstamp',
+            constraint=models.UniqueConstraint(fields=('scope', 'object_key'), name='unique_scope_object_key'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.db import migrations
+
+TABLE = 'reviews_title_search'
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    Title = apps.get_model('reviews', 'Title')
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE TABLE {TABLE} ('
+            'title_id integer PRIMARY KEY, '
+            'document tsvector NOT NULL)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX {TABLE}_document_idx ON {TABLE} '
+            'USING GIN (document)'
+        )
+        config = getattr(settings, 'TITLE_SEARCH', {}).get('CONFIG', 'simple')
+        schema_editor.execute(
+            f'INSERT INTO {TABLE} (title_id, document) '
+            "SELECT id, setweight(to_tsvector(%s::regconfig, name), 'A') || "
+            'setweight(to_tsvector(%s::regconfig, '
+            "coalesce(description, '')), 'B') FROM reviews_title",
+            [config, config]
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {TABLE} USING fts5('
+            "name, description, reviews, tokenize='unicode61', "
+            "prefix='2 3')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO {TABLE} (rowid, name, description, reviews) '
+            "SELECT id, name, coalesce(description, ''), '' "
+            f'FROM {Title._meta.db_table}'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute(f'DROP TABLE {TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_versionstamp'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
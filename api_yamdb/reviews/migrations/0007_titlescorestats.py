@@ -0,0 +1,57 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def fill_stats(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    TitleScoreStats = apps.get_model('reviews', 'TitleScoreStats')
+    histogram = {
+        f'score_{score}': Count('pk', filter=Q(score=score))
+        for score in range(1, 11)
+    }
+    rows = Review.objects.order_by().values('title').annotate(
+        total_count=Count('pk'), total_sum=Sum('score'), **histogram
+    )
+    TitleScoreStats.objects.bulk_create(
+        TitleScoreStats(title_id=row.pop('title'),
+                        reviews_count=row.pop('total_count'),
+                        score_sum=row.pop('total_sum'),
+                        **row)
+        for row in rows.iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_genre_title_through'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleScoreStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score_stats', serialize=False, to='reviews.Title', verbose_name='произведение')),
+                ('reviews_count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.PositiveIntegerField(default=0)),
+                ('score_1', models.PositiveIntegerField(default=0)),
+                ('score_2', models.PositiveIntegerField(default=0)),
+                ('score_3', models.PositiveIntegerField(default=0)),
+                ('score_4', models.PositiveIntegerField(default=0)),
+                ('score_5', models.PositiveIntegerField(default=0)),
+                ('score_6', models.PositiveIntegerField(default=0)),
+                ('score_7', models.PositiveIntegerField(default=0)),
+                ('score_8', models.PositiveIntegerField(default=0)),
+                ('score_9', models.PositiveIntegerField(default=0)),
+                ('score_10', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Статистика оценок',
+                'verbose_name_plural': 'Статистика оценок',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_titleranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingPrior',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mean', models.FloatField(verbose_name='средняя оценка')),
+                ('reviews_count', models.PositiveIntegerField(default=0)),
+                ('computed', models.DateTimeField(auto_now=True, verbose_name='вычислена')),
+            ],
+            options={
+                'verbose_name': 'Средняя оценка рейтинга',
+                'verbose_name_plural': 'Средняя оценка рейтинга',
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+TABLE = 'reviews_title_search'
+
+
+def drop_title_fk(apps, schema_editor):
+    """
+    Индекс чистят сигнал post_delete и rebuild_search_index,
+    а внешний ключ мешает TRUNCATE таблицы произведений.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'ALTER TABLE {TABLE} '
+            f'DROP CONSTRAINT IF EXISTS {TABLE}_title_id_fkey'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_rankingprior'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_title_fk, migrations.RunPython.noop),
+    ]
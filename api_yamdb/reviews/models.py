@@ -1,6 +1,10 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import (Case, Count, F, FloatField, IntegerField,
+                              OuterRef, Q, Subquery, Sum, When)
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -62,6 +66,7 @@ class Title(models.Model):
     )
     genre = models.ManyToManyField(
         Genre,
+        through='GenreTitle',
     )
     category = models.ForeignKey(
         Category,
@@ -70,15 +75,134 @@ class Title(models.Model):
         related_name='title',
         null=True
     )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='рейтинг'
+    )
+    reviews_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='количество отзывов'
+    )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='сумма оценок'
+    )
 
     class Meta:
         ordering = ['-id']
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(
+                fields=['category', 'year'],
+                name='title_category_year_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def add_review_score(self, score):
+        """Учесть оценку нового отзыва в рейтинге."""
+        self._shift_scores(score, 1)
+        TitleScoreStats.shift(self.pk, added=score)
+
+    def remove_review_score(self, score):
+        """Исключить оценку удалённого отзыва из рейтинга."""
+        self._shift_scores(-score, -1)
+        TitleScoreStats.shift(self.pk, removed=score)
+
+    def change_review_score(self, old_score, new_score):
+        """Пересчитать рейтинг после изменения оценки отзыва."""
+        if old_score != new_score:
+            self._shift_scores(new_score - old_score, 0)
+            TitleScoreStats.shift(self.pk, added=new_score,
+                                  removed=old_score)
+
+    def _shift_scores(self, score_delta, count_delta):
+        """
+        Обновляет сумму, количество оценок и рейтинг одним UPDATE.
+
+        Все выражения в SET вычисляются по старым значениям строки,
+        поэтому параллельные отзывы не теряют обновления.
+        """
+        new_sum = F('score_sum') + score_delta
+        new_count = F('reviews_count') + count_delta
+        Title.objects.filter(pk=self.pk).update(
+            score_sum=new_sum,
+            reviews_count=new_count,
+            rating=Case(
+                When(
+                    reviews_count__gt=-count_delta,
+                    then=Cast(new_sum, FloatField()) / new_count
+                ),
+                default=None,
+                output_field=FloatField()
+            )
+        )
+
+    @classmethod
+    def rebuild_ratings(cls):
+        """Пересчитать рейтинги всех произведений по таблице отзывов."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        count = Subquery(
+            reviews.annotate(value=Count('pk')).values('value'),
+            output_field=IntegerField()
+        )
+        total = Subquery(
+            reviews.annotate(value=Sum('score')).values('value'),
+            output_field=IntegerField()
+        )
+        cls.objects.update(
+            reviews_count=Coalesce(count, 0),
+            score_sum=Coalesce(total, 0),
+        )
+        TitleScoreStats.rebuild()
+        return cls.objects.update(
+            rating=Case(
+                When(
+                    reviews_count__gt=0,
+                    then=Cast(F('score_sum'), FloatField())
+                    / F('reviews_count')
+                ),
+                default=None,
+                output_field=FloatField()
+            )
+        )
+
+
+class GenreTitle(models.Model):
+    """Связь произведения с жанром."""
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        verbose_name='произведение'
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        verbose_name='жанр'
+    )
+
+    class Meta:
+        db_table = 'reviews_title_genre'
+        verbose_name = 'Жанр произведения'
+        verbose_name_plural = 'Жанры произведений'
+        unique_together = [['title', 'genre']]
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'],
+                name='genre_title_genre_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.title_id}: {self.genre_id}'
+
 
 class Review(models.Model):
     """Модель для работы с отзывами."""
@@ -99,6 +223,12 @@ class Review(models.Model):
     class Meta:
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
@@ -109,6 +239,43 @@ class Review(models.Model):
     def __str__(self):
         return self.text[:TEXT_LEN]
 
+    @classmethod
+    def latest_per_title(cls, title_ids, limit):
+        """
+        Последние limit отзывов каждого из произведений title_ids.
+
+        На каждое произведение - подзапрос с LIMIT по индексу
+        review_title_pub_date_idx, подзапросы объединены UNION ALL.
+        Каждый читает не больше limit строк, сколько бы отзывов
+        ни было у произведения. Условие - через extra(where=...),
+        как в reviews.search: `pk__in=RawSQL` SQLite понимает неверно.
+        """
+        title_ids = list(title_ids)
+        if not title_ids:
+            return cls.objects.none()
+        quote = connection.ops.quote_name
+        pk = '{}.{}'.format(
+            quote(cls._meta.db_table), quote(cls._meta.pk.column)
+        )
+        select = (
+            'SELECT {pk} FROM (SELECT {pk} FROM {table} WHERE {title} = %s '
+            'ORDER BY {pub_date} DESC, {pk} DESC LIMIT %s) AS {{alias}}'
+        ).format(
+            pk=quote(cls._meta.pk.column),
+            table=quote(cls._meta.db_table),
+            title=quote(cls._meta.get_field('title').column),
+            pub_date=quote(cls._meta.get_field('pub_date').column),
+        )
+        union = ' UNION ALL '.join(
+            select.format(alias=f'latest_{number}')
+            for number in range(len(title_ids))
+        )
+        params = [value for title_id in title_ids
+                  for value in (title_id, limit)]
+        return cls.objects.extra(
+            where=[f'{pk} IN ({union})'], params=params
+        ).order_by('-pub_date', '-id')
+
 
 class Comment(models.Model):
     """Модель для работы с комментариями к отзывам."""
@@ -125,6 +292,247 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['-id']
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:TEXT_LEN]
+
+
+class TitleScoreStats(models.Model):
+    """
+    Агрегаты оценок произведения: количество, сумма и гистограмма.
+
+    Обновляется вместе с рейтингом при записи отзывов, поэтому
+    статистика читается без обхода таблицы отзывов.
+    """
+
+    SCORES = range(1, 11)
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score_stats',
+        verbose_name='произведение'
+    )
+    reviews_count = models.PositiveIntegerField(default=0)
+    score_sum = models.PositiveIntegerField(default=0)
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Статистика оценок'
+        verbose_name_plural = 'Статистика оценок'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.reviews_count}'
+
+    @property
+    def histogram(self):
+        return {score: getattr(self, f'score_{score}')
+                for score in self.SCORES}
+
+    @property
+    def mean(self):
+        if not self.reviews_count:
+            return None
+        return self.score_sum / self.reviews_count
+
+    @property
+    def median(self):
+        """Медиана по гистограмме: среднее двух центральных оценок."""
+        if not self.reviews_count:
+            return None
+        positions = [(self.reviews_count - 1) // 2, self.reviews_count // 2]
+        values = []
+        seen = 0
+        for score, amount in self.histogram.items():
+            seen += amount
+            while positions and positions[0] < seen:
+                values.append(score)
+                positions.pop(0)
+        return sum(values) / len(values)
+
+    @classmethod
+    def shift(cls, title_id, added=None, removed=None):
+        """
+        Сдвинуть счётчики одним UPDATE, создав строку при первом отзыве.
+
+        Без строки удалять нечего: её уже удалил каскад произведения.
+        """
+        changes = {}
+        count_delta = score_delta = 0
+        if added is not None:
+            changes[f'score_{added}'] = F(f'score_{added}') + 1
+            count_delta += 1
+            score_delta += added
+        if removed is not None:
+            changes[f'score_{removed}'] = F(f'score_{removed}') - 1
+            count_delta -= 1
+            score_delta -= removed
+        changes.update(
+            reviews_count=F('reviews_count') + count_delta,
+            score_sum=F('score_sum') + score_delta,
+        )
+        if cls.objects.filter(title_id=title_id).update(**changes):
+            return
+        if added is None:
+            return
+        cls.objects.get_or_create(title_id=title_id)
+        cls.objects.filter(title_id=title_id).update(**changes)
+
+    @classmethod
+    def rebuild(cls):
+        """Пересчитать статистику всех произведений с нуля."""
+        histogram = {
+            f'score_{score}': Count('pk', filter=Q(score=score))
+            for score in cls.SCORES
+        }
+        rows = Review.objects.order_by().values('title').annotate(
+            total_count=Count('pk'), total_sum=Sum('score'), **histogram
+        )
+        cls.objects.all().delete()
+        cls.objects.bulk_create(
+            (cls(title_id=row.pop('title'),
+                 reviews_count=row.pop('total_count'),
+                 score_sum=row.pop('total_sum'),
+                 **row)
+             for row in rows.iterator()),
+            batch_size=1000
+        )
+
+
+class TitleRanking(models.Model):
+    """
+    Место произведения в рейтинге лучших: байесовское среднее оценок.
+
+    Хранит только произведения, набравшие минимум отзывов;
+    заполняется и обновляется функциями reviews.leaderboard.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='ranking',
+        verbose_name='произведение'
+    )
+    score = models.FloatField(verbose_name='байесовская оценка')
+    reviews_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Рейтинг произведений'
+        indexes = [
+            models.Index(
+                fields=['-score', '-reviews_count'],
+                name='title_ranking_score_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score:.2f}'
+
+
+class RankingPrior(models.Model):
+    """
+    Средняя оценка по всем отзывам для рейтинга лучших.
+
+    Единственная строка; пишется только полным пересчётом
+    рейтинга, запись отзыва её лишь читает.
+    """
+
+    mean = models.FloatField(verbose_name='средняя оценка')
+    reviews_count = models.PositiveIntegerField(default=0)
+    computed = models.DateTimeField(auto_now=True, verbose_name='вычислена')
+
+    class Meta:
+        verbose_name = 'Средняя оценка рейтинга'
+        verbose_name_plural = 'Средняя оценка рейтинга'
+
+    def __str__(self):
+        return f'{self.mean:.2f}'
+
+
+class VersionStamp(models.Model):
+    """
+    Версия коллекции или отдельного объекта для условных GET-запросов.
+
+    Строка с пустым object_key - версия всей коллекции.
+    """
+
+    scope = models.CharField(max_length=32, verbose_name='коллекция')
+    object_key = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        verbose_name='ключ объекта'
+    )
+    version = models.PositiveIntegerField(default=1, verbose_name='версия')
+    modified = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='время изменения'
+    )
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'object_key'],
+                name='unique_scope_object_key',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.scope}:{self.object_key} v{self.version}'
+
+    @classmethod
+    def bump(cls, scope, *object_keys, collection=True):
+        """
+        Увеличить версию перечисленных объектов и коллекции.
+
+        Строку коллекции обновляет каждая запись в scope, поэтому
+        она обновляется последней и блокируется только до коммита.
+        collection=False - для изменений, которых не видно в списке.
+        """
+        now = timezone.now()
+        keys = [*map(str, object_keys), *([''] if collection else [])]
+        for key in keys:
+            updated = cls.objects.filter(scope=scope, object_key=key).update(
+                version=F('version') + 1, modified=now
+            )
+            if updated:
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(
+                        scope=scope, object_key=key, modified=now
+                    )
+            except IntegrityError:
+                cls.objects.filter(scope=scope, object_key=key).update(
+                    version=F('version') + 1, modified=now
+                )
+
+    @classmethod
+    def lookup(cls, scope, object_key=None):
+        """Версии коллекции и объекта одним запросом."""
+        keys = [''] if object_key is None else ['', str(object_key)]
+        return list(
+            cls.objects.filter(scope=scope, object_key__in=keys)
+            .order_by('object_key')
+            .values_list('version', 'modified')
+        )
@@ -0,0 +1,200 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Title
+
+TABLE = 'reviews_title_search'
+TERM_PATTERN = re.compile(r'\w+')
+
+DEFAULT_SETTINGS = {
+    'CONFIG': 'simple',
+    'INCLUDE_REVIEWS': False,
+}
+
+
+def get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'TITLE_SEARCH', {})}
+
+
+def get_terms(query):
+    return TERM_PATTERN.findall(query.lower())
+
+
+def document_parts(title):
+    """Текст, который индексируется для произведения."""
+    reviews = ''
+    if get_settings()['INCLUDE_REVIEWS']:
+        reviews = '\n'.join(title.reviews.values_list('text', flat=True))
+    return title.name, title.description or '', reviews
+
+
+class PostgresSearchBackend:
+    """
+    Поиск через tsvector с GIN-индексом и ранжированием ts_rank.
+
+    Документы и запросы строятся с TITLE_SEARCH['CONFIG']; после его
+    смены индекс нужно перестроить командой rebuild_search_index.
+    """
+
+    @staticmethod
+    def update(cursor, title_id, parts):
+        config = get_settings()['CONFIG']
+        cursor.execute(
+            f'INSERT INTO {TABLE} (title_id, document) VALUES (%s, '
+            "setweight(to_tsvector(%s::regconfig, %s), 'A') || "
+            "setweight(to_tsvector(%s::regconfig, %s), 'B') || "
+            "setweight(to_tsvector(%s::regconfig, %s), 'C')) "
+            'ON CONFLICT (title_id) DO UPDATE '
+            'SET document = EXCLUDED.document',
+            [title_id, config, parts[0], config, parts[1], config, parts[2]]
+        )
+
+    @staticmethod
+    def remove(cursor, title_id):
+        cursor.execute(f'DELETE FROM {TABLE} WHERE title_id = %s',
+                       [title_id])
+
+    @staticmethod
+    def clear(cursor):
+        cursor.execute(f'DELETE FROM {TABLE}')
+
+    @staticmethod
+    def search(queryset, terms):
+        config = get_settings()['CONFIG']
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        matches = (
+            f'"reviews_title"."id" IN (SELECT title_id FROM {TABLE} '
+            'WHERE document @@ to_tsquery(%s::regconfig, %s))'
+        )
+        rank = RawSQL(
+            f'SELECT ts_rank(document, to_tsquery(%s::regconfig, %s)) '
+            f'FROM {TABLE} WHERE title_id = "reviews_title"."id"',
+            [config, tsquery]
+        )
+        return queryset.extra(
+            where=[matches], params=[config, tsquery]
+        ).annotate(search_rank=rank)
+
+
+class SqliteSearchBackend:
+    """
+    Поиск через виртуальную таблицу FTS5 с ранжированием bm25.
+
+    Условие отбора добавляется через extra(where=...): `pk__in=RawSQL`
+    оборачивает подзапрос в двойные скобки, и SQLite сравнивает
+    id только с первой строкой подзапроса.
+    """
+
+    weights = (10.0, 5.0, 1.0)
+
+    @staticmethod
+    def update(cursor, title_id, parts):
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [title_id])
+        cursor.execute(
+            f'INSERT INTO {TABLE} (rowid, name, description, reviews) '
+            'VALUES (%s, %s, %s, %s)',
+            [title_id, *parts]
+        )
+
+    @staticmethod
+    def remove(cursor, title_id):
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [title_id])
+
+    @staticmethod
+    def clear(cursor):
+        cursor.execute(f'DELETE FROM {TABLE}')
+
+    def search(self, queryset, terms):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        matches = (
+            f'"reviews_title"."id" IN '
+            f'(SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s)'
+        )
+        weights = ', '.join(str(weight) for weight in self.weights)
+        rank = RawSQL(
+            f'SELECT -bm25({TABLE}, {weights}) FROM {TABLE} '
+            f'WHERE {TABLE} MATCH %s AND rowid = "reviews_title"."id"',
+            [match]
+        )
+        return queryset.extra(
+            where=[matches], params=[match]
+        ).annotate(search_rank=rank)
+
+
+class FallbackSearchBackend:
+    """Для прочих СУБД: поиск подстрок без индекса и без ранжирования."""
+
+    @staticmethod
+    def update(cursor, title_id, parts):
+        pass
+
+    @staticmethod
+    def remove(cursor, title_id):
+        pass
+
+    @staticmethod
+    def clear(cursor):
+        pass
+
+    @staticmethod
+    def search(queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(
+                Q(name__icontains=term) | Q(description__icontains=term)
+            )
+        return queryset
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend(),
+    'sqlite': SqliteSearchBackend(),
+}
+
+
+def get_backend(vendor=None):
+    return BACKENDS.get(vendor or connection.vendor, FallbackSearchBackend())
+
+
+def index_titles(titles):
+    """Обновить документы поискового индекса для переданных произведений."""
+    backend = get_backend()
+    with connection.cursor() as cursor:
+        for title in titles:
+            backend.update(cursor, title.pk, document_parts(title))
+
+
+def rebuild_index():
+    """Перестроить индекс по всем произведениям."""
+    backend = get_backend()
+    with connection.cursor() as cursor:
+        backend.clear(cursor)
+    titles = Title.objects.only('name', 'description').iterator(
+        chunk_size=2000
+    )
+    index_titles(titles)
+
+
+def remove_title(title_id):
+    with connection.cursor() as cursor:
+        get_backend().remove(cursor, title_id)
+
+
+def search_titles(queryset, query):
+    """
+    Отфильтровать queryset по поисковому запросу.
+
+    Каждое слово запроса ищется как префикс, все слова обязательны.
+    Результаты упорядочены по релевантности, затем по id.
+    """
+    terms = get_terms(query)
+    if not terms:
+        return queryset
+    backend = get_backend()
+    queryset = backend.search(queryset, terms)
+    if isinstance(backend, FallbackSearchBackend):
+        return queryset
+    return queryset.order_by('-search_rank', '-id')
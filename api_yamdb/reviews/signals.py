@@ -0,0 +1,85 @@
+import threading
+
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from . import leaderboard, search
+from .models import Review, Title, VersionStamp
+
+_deleting = threading.local()
+
+
+def _deleting_titles():
+    if not hasattr(_deleting, 'titles'):
+        _deleting.titles = set()
+    return _deleting.titles
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, **kwargs):
+    search.index_titles([instance])
+
+
+@receiver(pre_delete, sender=Title)
+def mark_title_deleting(sender, instance, **kwargs):
+    """
+    Отзывы удаляемого произведения удаляются каскадом вместе с ним:
+    пересчитывать его рейтинг и место в этом случае незачем.
+    """
+    _deleting_titles().add(instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(sender, instance, **kwargs):
+    _deleting_titles().discard(instance.pk)
+    search.remove_title(instance.pk)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def reindex_review_title(sender, instance, **kwargs):
+    if search.get_settings()['INCLUDE_REVIEWS']:
+        title = Title.objects.filter(pk=instance.title_id).first()
+        if title is not None:
+            search.index_titles([title])
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, raw=False, **kwargs):
+    instance._saved_score = None
+    if instance.pk is not None and not raw:
+        instance._saved_score = Review.objects.filter(
+            pk=instance.pk
+        ).values_list('score', flat=True).first()
+
+
+@receiver(post_save, sender=Review)
+def count_review_score(sender, instance, created, raw=False, **kwargs):
+    """
+    Рейтинг, статистика и место произведения следуют за каждой
+    записью отзыва, откуда бы она ни пришла: API, админка или shell.
+    """
+    if raw:
+        return
+    old_score = getattr(instance, '_saved_score', None)
+    title = Title(pk=instance.title_id)
+    if created or old_score is None:
+        title.add_review_score(instance.score)
+    elif old_score != instance.score:
+        title.change_review_score(old_score, instance.score)
+    else:
+        VersionStamp.bump('titles', instance.title_id, collection=False)
+        return
+    leaderboard.refresh_titles([instance.title_id])
+    VersionStamp.bump('titles', instance.title_id)
+
+
+@receiver(post_delete, sender=Review)
+def discount_review_score(sender, instance, **kwargs):
+    """Удаление отзыва, в том числе каскадом от его автора."""
+    if instance.title_id in _deleting_titles():
+        return
+    Title(pk=instance.title_id).remove_review_score(instance.score)
+    leaderboard.refresh_titles([instance.title_id])
+    VersionStamp.bump('titles', instance.title_id)
@@ -0,0 +1,114 @@
+import pytest
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create(
+        username='TestAdmin', email='admin@yamdb.fake', role='admin'
+    )
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create(
+        username='TestUser', email='user@yamdb.fake'
+    )
+
+
+@pytest.fixture
+def admin_client(admin):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {admin.token}')
+    return client
+
+
+@pytest.fixture
+def anon_client():
+    from rest_framework.test import APIClient
+
+    return APIClient()
+
+
+@pytest.fixture
+def catalogue(django_user_model):
+    """Наполняет базу: произведения с жанрами, отзывы и комментарии."""
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    def make(titles=10, reviews=10, comments=10):
+        category = Category.objects.create(name='Фильм', slug='film')
+        genres = [
+            Genre.objects.create(name='Драма', slug='drama'),
+            Genre.objects.create(name='Комедия', slug='comedy'),
+        ]
+        authors = [
+            django_user_model.objects.create(
+                username=f'author{number}', email=f'author{number}@yamdb.fake'
+            )
+            for number in range(max(reviews, comments))
+        ]
+        created = []
+        for number in range(titles):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000 + number,
+                category=category
+            )
+            title.genre.set(genres)
+            created.append(title)
+        title = created[0]
+        for number in range(reviews):
+            Review.objects.create(
+                title=title, author=authors[number], text='Отзыв',
+                score=number % 10 + 1
+            )
+        review = title.reviews.first()
+        for number in range(comments):
+            Comment.objects.create(
+                review=review, author=authors[number], text='Комментарий'
+            )
+        return title, review
+
+    return make
+
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    """Общий кэш переживает тест и прогон, а база - нет."""
+    from auths.cache import get_user_cache
+    from django.conf import settings
+    from django.core.cache import caches
+
+    get_user_cache.cache_clear()
+    for alias in settings.CACHES:
+        caches[alias].clear()
+    yield
+    get_user_cache.cache_clear()
+
+
+@pytest.fixture
+def query_detector():
+    """
+    Контекстный менеджер: падает, если внутри блока нашёлся N+1.
+
+    N+1 - одна и та же форма запроса не меньше REPEAT_THRESHOLD раз.
+    """
+    from contextlib import contextmanager
+
+    from api_yamdb.querydetector import QueryDetector
+
+    @contextmanager
+    def check(repeat_threshold=None):
+        with QueryDetector(repeat_threshold=repeat_threshold) as detector:
+            yield detector
+        repeated = detector.repeated()
+        assert not repeated, f'Найдены повторяющиеся запросы: {repeated}'
+
+    return check
+
+
+@pytest.fixture
+def shared_cache():
+    from django.core.cache import caches
+
+    return caches['shared']
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+
+import pytest
+
+
+def call(application, path):
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    async def request():
+        await application({
+            'type': 'http', 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'root_path': '',
+            'query_string': b'', 'headers': [(b'host', b'localhost')],
+            'server': ('localhost', 80),
+        }, receive, send)
+
+    asyncio.run(request())
+    return messages
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsgi:
+
+    def test_request_in_pool_thread(self):
+        from django.core.signals import request_finished
+
+        from api_yamdb.asgi import get_asgi_application
+
+        finished = []
+
+        def on_finished(**kwargs):
+            finished.append(threading.current_thread().name)
+
+        application = get_asgi_application(threads=2)
+        request_finished.connect(on_finished)
+        try:
+            messages = call(application, '/api/v1/genres/')
+        finally:
+            request_finished.disconnect(on_finished)
+            application.executor.shutdown()
+        assert messages[0]['type'] == 'http.response.start'
+        assert messages[0]['status'] == 200, (
+            'Проверьте, что ASGI-приложение отвечает на GET-запрос'
+        )
+        assert b''.join(
+            message.get('body', b'') for message in messages[1:]
+        ).startswith(b'{')
+        assert len(finished) == 1, (
+            'Проверьте, что после ответа Django получает request_finished'
+        )
+        assert finished[0].startswith('asgi'), (
+            'Проверьте, что запрос выполняется в потоке из пула ASGI'
+        )
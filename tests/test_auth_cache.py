@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+
+class TestLocMemUserCache:
+
+    def test_lru_bound(self):
+        from auths.cache import LocMemUserCache
+
+        cache = LocMemUserCache(timeout=60, max_size=2)
+        for key in ('a', 'b', 'c'):
+            cache._set(key, key, 60)
+        assert cache._get('a') is None, (
+            'Проверьте, что кэш вытесняет самые старые записи'
+        )
+        assert cache._get('c') == 'c'
+
+    def test_payload_respects_exp(self):
+        from auths.cache import LocMemUserCache
+
+        cache = LocMemUserCache(timeout=60)
+        cache.set_payload('expired', {'id': 1, 'exp': time.time() - 1})
+        cache.set_payload('valid', {'id': 1, 'exp': time.time() + 30})
+        assert cache.get_payload('expired') is None, (
+            'Проверьте, что просроченный токен не попадает в кэш'
+        )
+        assert cache.get_payload('valid') == {
+            'id': 1, 'exp': pytest.approx(time.time() + 30, abs=5)
+        }
+
+    def test_short_timeout(self):
+        from auths.cache import LocMemUserCache
+
+        cache = LocMemUserCache(timeout=3600)
+        assert cache.timeout == LocMemUserCache.MAX_TIMEOUT, (
+            'Проверьте, что кэш одного процесса хранит записи недолго'
+        )
+
+
+@pytest.mark.django_db
+class TestJWTAuthenticationCache:
+
+    def test_user_lookup_is_cached(self, user, django_assert_num_queries):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {user.token}')
+        client.get('/api/v1/users/me/')
+        with django_assert_num_queries(1):
+            response = client.get('/api/v1/users/me/')
+        assert response.status_code == 200, (
+            'Проверьте, что пользователь из кэша проходит аутентификацию'
+        )
+
+    def test_role_change_invalidates_cache(self, admin_client, user):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {user.token}')
+        assert client.get('/api/v1/users/').status_code == 403
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', {'role': 'admin'}
+        )
+        assert response.status_code == 200
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что смена роли сбрасывает кэш пользователя'
+        )
+
+    def test_default_cache_is_shared(self, user, shared_cache):
+        from auths.cache import DjangoUserCache, get_user_cache
+
+        cache = get_user_cache()
+        assert isinstance(cache, DjangoUserCache), (
+            'Проверьте, что по умолчанию кэш общий для всех воркеров'
+        )
+        cache.set_user(user)
+        assert shared_cache.get(f'jwt-auth:user:{user.pk}') is not None
+
+    def test_user_save_invalidates_cache(self, user):
+        from auths.cache import get_user_cache
+
+        cache = get_user_cache()
+        cache.set_user(user)
+        user.is_active = False
+        user.save()
+        assert cache.get_user(user.pk) is None, (
+            'Проверьте, что любое сохранение пользователя сбрасывает кэш'
+        )
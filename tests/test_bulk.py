@@ -0,0 +1,106 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestBulkWrite:
+
+    def test_bulk_genres_and_upsert(self, admin_client):
+        from reviews.models import Genre
+
+        Genre.objects.create(name='Старое', slug='drama')
+        payload = [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+            {'name': 'Повтор', 'slug': 'comedy'},
+            {'name': 'Без слага'},
+        ]
+        response = admin_client.post(
+            '/api/v1/genres/bulk/', payload, format='json'
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [item['status'] for item in data['results']] == [
+            'invalid', 'created', 'invalid', 'invalid'
+        ], 'Проверьте, что существующий слаг без upsert считается ошибкой'
+        assert (data['created'], data['invalid']) == (1, 3)
+
+        response = admin_client.post(
+            '/api/v1/genres/bulk/?upsert=true', payload[:2], format='json'
+        )
+        assert [item['status'] for item in response.json()['results']] == [
+            'updated', 'updated'
+        ]
+        assert Genre.objects.get(slug='drama').name == 'Драма'
+        assert Genre.objects.count() == 2
+
+    def test_bulk_titles(self, admin_client, django_assert_max_num_queries):
+        from reviews.models import Category, Genre, Title
+
+        Category.objects.create(name='Фильм', slug='film')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        payload = [
+            {'name': f'Фильм {number}', 'year': 2000 + number,
+             'genre': ['drama', 'comedy'], 'category': 'film'}
+            for number in range(20)
+        ]
+        payload.append({'name': 'Плохой', 'year': 2000,
+                        'genre': ['horror'], 'category': 'film'})
+        admin_client.get('/api/v1/genres/')
+        with django_assert_max_num_queries(80):
+            response = admin_client.post(
+                '/api/v1/titles/bulk/', payload, format='json'
+            )
+        assert response.status_code == 200
+        data = response.json()
+        assert (data['created'], data['invalid']) == (20, 1)
+        assert 'genre' in data['results'][-1]['errors']
+        title = Title.objects.get(pk=data['results'][0]['id'])
+        assert sorted(title.genre.values_list('slug', flat=True)) == [
+            'comedy', 'drama'
+        ]
+        search = admin_client.get('/api/v1/titles/', {'search': 'Фильм'})
+        assert search.json()['count'] == 20, (
+            'Проверьте, что созданные пакетом произведения попадают в поиск'
+        )
+
+        payload = [{'name': 'Фильм 0', 'year': 2000, 'genre': ['drama'],
+                    'category': 'film', 'description': 'Новое'}]
+        response = admin_client.post(
+            '/api/v1/titles/bulk/?upsert=true', payload, format='json'
+        )
+        assert response.json()['updated'] == 1
+        title.refresh_from_db()
+        assert title.description == 'Новое'
+        assert list(title.genre.values_list('slug', flat=True)) == ['drama']
+
+        payload = [
+            {'name': 'Новый', 'year': 2021, 'genre': [], 'category': 'film'},
+            {'name': 'Новый', 'year': 2021, 'genre': [], 'category': 'film'},
+        ]
+        response = admin_client.post(
+            '/api/v1/titles/bulk/?upsert=true', payload, format='json'
+        )
+        assert [item['status'] for item in response.json()['results']] == [
+            'created', 'invalid'
+        ], 'Проверьте, что повтор (name, year) в пакете с upsert - ошибка'
+        assert Title.objects.filter(name='Новый').count() == 1
+
+    def test_bulk_limits_and_permissions(self, client, user, admin_client,
+                                         settings):
+        settings.BULK_MAX_ITEMS = 2
+        payload = [{'name': str(number), 'slug': f's{number}'}
+                   for number in range(3)]
+        response = admin_client.post(
+            '/api/v1/categories/bulk/', payload, format='json'
+        )
+        assert response.status_code == 400
+        response = admin_client.post(
+            '/api/v1/categories/bulk/', {'name': 'x'}, format='json'
+        )
+        assert response.status_code == 400
+        response = client.post(
+            '/api/v1/categories/bulk/', payload[:2],
+            content_type='application/json'
+        )
+        assert response.status_code == 401
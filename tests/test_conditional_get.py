@@ -0,0 +1,81 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/', '/api/v1/genres/', '/api/v1/categories/'
+    ])
+    def test_not_modified(self, anon_client, catalogue, url,
+                          django_assert_max_num_queries):
+        catalogue(titles=2, reviews=1, comments=1)
+        response = anon_client.get(url)
+        assert response.status_code == 200
+        assert response.has_header('ETag'), (
+            f'Проверьте, что ответ `{url}` содержит заголовок ETag'
+        )
+        with django_assert_max_num_queries(1):
+            response = anon_client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении If-None-Match '
+            'возвращается 304 без выборки данных'
+        )
+
+    def test_review_changes_title_etag(self, anon_client, catalogue, user):
+        from rest_framework.test import APIClient
+
+        title, _ = catalogue(titles=1, reviews=1, comments=1)
+        url = f'/api/v1/titles/{title.id}/'
+        etag = anon_client.get(url)['ETag']
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {user.token}')
+        response = client.post(
+            f'{url}reviews/', {'text': 'Отзыв', 'score': 1}
+        )
+        assert response.status_code == 201
+        response = anon_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что новый отзыв меняет ETag произведения'
+        )
+        assert response['ETag'] != etag
+
+    def test_review_text_keeps_list_etag(self, anon_client, catalogue,
+                                         user):
+        from rest_framework.test import APIClient
+
+        title, _ = catalogue(titles=1, reviews=1, comments=1)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {user.token}')
+        url = f'/api/v1/titles/{title.id}/'
+        review = client.post(
+            f'{url}reviews/', {'text': 'Отзыв', 'score': 5}
+        ).json()
+        list_etag = anon_client.get('/api/v1/titles/')['ETag']
+        etag = anon_client.get(url)['ETag']
+        client.patch(f'{url}reviews/{review["id"]}/', {'text': 'Правка'})
+        assert anon_client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=list_etag
+        ).status_code == 304, (
+            'Проверьте, что правка текста отзыва не меняет версию '
+            'списка произведений'
+        )
+        assert anon_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+        client.patch(f'{url}reviews/{review["id"]}/', {'score': 6})
+        assert anon_client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=list_etag
+        ).status_code == 200, (
+            'Проверьте, что смена оценки меняет рейтинг в списке'
+        )
+
+    def test_genre_write_changes_list_etag(self, admin_client, anon_client):
+        etag = anon_client.get('/api/v1/genres/')['ETag']
+        admin_client.post(
+            '/api/v1/genres/', {'name': 'Драма', 'slug': 'drama'}
+        )
+        response = anon_client.get(
+            '/api/v1/genres/', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 200
@@ -0,0 +1,109 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestConfirmationCode:
+
+    def signup(self, client):
+        from auths.models import OutboundEmail
+
+        response = client.post(
+            '/api/v1/auth/signup/',
+            {'username': 'newbie', 'email': 'newbie@yamdb.fake'}
+        )
+        assert response.status_code == 200
+        return OutboundEmail.objects.get(recipient='newbie@yamdb.fake').body
+
+    def test_code_is_not_password(self, anon_client, django_user_model):
+        from auths.models import ConfirmationCode
+
+        code = self.signup(anon_client)
+        user = django_user_model.objects.get(username='newbie')
+        assert not user.has_usable_password(), (
+            'Проверьте, что код не сохраняется в User.password'
+        )
+        assert ConfirmationCode.objects.get(user=user).digest != code
+
+    def test_token_single_use(self, anon_client,
+                              django_assert_max_num_queries):
+        code = self.signup(anon_client)
+        data = {'username': 'newbie', 'confirmation_code': code}
+        with django_assert_max_num_queries(2):
+            response = anon_client.post('/api/v1/auth/token/', data)
+        assert response.status_code == 200 and 'token' in response.json(), (
+            'Проверьте, что по коду выдаётся токен одним чтением и '
+            'одной записью'
+        )
+        response = anon_client.post('/api/v1/auth/token/', data)
+        assert response.status_code == 400, (
+            'Проверьте, что код подтверждения одноразовый'
+        )
+
+    def test_second_token_after_signup_again(self, anon_client):
+        from auths.models import OutboundEmail
+
+        code = self.signup(anon_client)
+        data = {'username': 'newbie', 'confirmation_code': code}
+        assert anon_client.post('/api/v1/auth/token/', data).status_code == 200
+        assert anon_client.post('/api/v1/auth/token/', data).status_code == 400
+        OutboundEmail.objects.all().delete()
+        code = self.signup(anon_client)
+        response = anon_client.post(
+            '/api/v1/auth/token/',
+            {'username': 'newbie', 'confirmation_code': code}
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что повторная регистрация с теми же username '
+            'и email присылает новый код'
+        )
+
+    def test_signup_taken_username(self, anon_client):
+        self.signup(anon_client)
+        response = anon_client.post(
+            '/api/v1/auth/signup/',
+            {'username': 'newbie', 'email': 'other@yamdb.fake'}
+        )
+        assert response.status_code == 400
+        response = anon_client.post(
+            '/api/v1/auth/signup/',
+            {'username': 'other', 'email': 'newbie@yamdb.fake'}
+        )
+        assert response.status_code == 400
+
+    def test_expired_code(self, anon_client, settings):
+        from datetime import timedelta
+
+        settings.CONFIRMATION_CODE_LIFETIME = timedelta(seconds=-1)
+        code = self.signup(anon_client)
+        response = anon_client.post(
+            '/api/v1/auth/token/',
+            {'username': 'newbie', 'confirmation_code': code}
+        )
+        assert response.status_code == 400
+
+    def test_unknown_user(self, anon_client):
+        self.signup(anon_client)
+        unknown = anon_client.post(
+            '/api/v1/auth/token/',
+            {'username': 'ghost', 'confirmation_code': 'code'}
+        )
+        wrong = anon_client.post(
+            '/api/v1/auth/token/',
+            {'username': 'newbie', 'confirmation_code': 'code'}
+        )
+        assert unknown.status_code == wrong.status_code == 400, (
+            'Проверьте, что ответ не выдаёт, существует ли пользователь'
+        )
+        assert unknown.json() == wrong.json()
+
+    def test_password_is_not_code(self, anon_client, django_user_model):
+        user = django_user_model.objects.create(
+            username='legacy', email='legacy@yamdb.fake'
+        )
+        user.set_password('secret')
+        user.save()
+        response = anon_client.post(
+            '/api/v1/auth/token/',
+            {'username': 'legacy', 'confirmation_code': 'secret'}
+        )
+        assert response.status_code == 400
@@ -0,0 +1,62 @@
+import pytest
+
+
+class TestReplicaRouting:
+
+    @pytest.fixture
+    def replica(self, settings):
+        settings.DATABASES = {
+            **settings.DATABASES, 'replica': settings.DATABASES['default']
+        }
+        settings.DATABASE_REPLICA = 'replica'
+
+    def route(self, request, view, status=200):
+        from api_yamdb.db import (PrimaryReplicaRouter,
+                                  ReplicaRoutingMiddleware)
+        from django.http import HttpResponse
+        from reviews.models import Title
+
+        seen = []
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            seen.append(PrimaryReplicaRouter().db_for_read(Title))
+            return HttpResponse(status=status)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = middleware(request)
+        return seen[0], response
+
+    def test_reads_and_writes(self, replica, rf):
+        from api.views import AdminViewSet, TitleViewSet
+        from api_yamdb.db import STICKY_COOKIE, PrimaryReplicaRouter
+        from reviews.models import Title
+
+        titles = TitleViewSet.as_view({'get': 'list', 'post': 'create'})
+        alias, _ = self.route(rf.get('/api/v1/titles/'), titles)
+        assert alias == 'replica', (
+            'Проверьте, что GET к произведениям читает с реплики'
+        )
+        assert PrimaryReplicaRouter().db_for_read(Title) is None
+        users = AdminViewSet.as_view({'get': 'list'})
+        alias, _ = self.route(rf.get('/api/v1/users/'), users)
+        assert alias is None
+        alias, response = self.route(rf.post('/api/v1/titles/'), titles, 201)
+        assert alias is None
+        assert STICKY_COOKIE in response.cookies
+        request = rf.get('/api/v1/titles/')
+        request.COOKIES[STICKY_COOKIE] = '1'
+        alias, _ = self.route(request, titles)
+        assert alias is None, (
+            'Проверьте, что после записи клиент читает из primary'
+        )
+
+    def test_without_replica(self, rf):
+        from api.views import TitleViewSet
+        from api_yamdb.db import STICKY_COOKIE
+
+        titles = TitleViewSet.as_view({'get': 'list', 'post': 'create'})
+        alias, _ = self.route(rf.get('/api/v1/titles/'), titles)
+        assert alias is None
+        _, response = self.route(rf.post('/api/v1/titles/'), titles, 201)
+        assert STICKY_COOKIE not in response.cookies
@@ -0,0 +1,106 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestExpand:
+
+    @pytest.fixture
+    def reviewed(self, catalogue, django_user_model):
+        """Несколько произведений, у каждого по пять отзывов."""
+        from reviews.models import Comment, Review, Title
+
+        catalogue(titles=4, reviews=0, comments=0)
+        readers = [
+            django_user_model.objects.create(
+                username=f'reader{number}', email=f'reader{number}@yamdb.fake'
+            )
+            for number in range(5)
+        ]
+        for title in Title.objects.all():
+            for reader in readers:
+                review = Review.objects.create(
+                    title=title, author=reader, text='Отзыв', score=5
+                )
+                for _ in range(review.pk % 3):
+                    Comment.objects.create(
+                        review=review, author=reader, text='Комментарий'
+                    )
+        return Title.objects.order_by('id')
+
+    def test_titles_latest_reviews(self, anon_client, reviewed):
+        from reviews.models import Review
+
+        response = anon_client.get(
+            '/api/v1/titles/?expand=latest_reviews&expand=comment_count'
+        )
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert results
+        for title in results:
+            latest = Review.objects.filter(
+                title_id=title['id']
+            ).order_by('-pub_date', '-id')[:3]
+            assert [review['id'] for review in title['latest_reviews']] == [
+                review.pk for review in latest
+            ], (
+                'Проверьте, что `latest_reviews` содержит три последних '
+                'отзыва произведения'
+            )
+            for review, expected in zip(title['latest_reviews'], latest):
+                assert review['comment_count'] == expected.comments.count()
+                assert review['author'] == expected.author.username
+
+    def test_title_detail_latest_reviews(self, anon_client, reviewed):
+        from reviews.models import Review
+
+        title = reviewed.last()
+        response = anon_client.get(
+            f'/api/v1/titles/{title.pk}/?expand=latest_reviews'
+        )
+        assert response.status_code == 200
+        assert [
+            review['id'] for review in response.json()['latest_reviews']
+        ] == list(Review.objects.filter(title=title).order_by(
+            '-pub_date', '-id'
+        ).values_list('id', flat=True)[:3])
+
+    def test_titles_without_expand(self, anon_client, reviewed):
+        response = anon_client.get('/api/v1/titles/')
+        assert 'latest_reviews' not in response.json()['results'][0]
+
+    @pytest.mark.parametrize('size', [1, 4])
+    def test_titles_expand_query_count(self, anon_client, catalogue, size,
+                                       django_assert_num_queries):
+        catalogue(titles=size, reviews=5, comments=5)
+        with django_assert_num_queries(4):
+            anon_client.get(
+                '/api/v1/titles/?expand=latest_reviews,comment_count'
+            )
+
+    def test_reviews_comment_count(self, anon_client, reviewed,
+                                   django_assert_num_queries):
+        title = reviewed.first()
+        url = f'/api/v1/titles/{title.pk}/reviews/?expand=comment_count'
+        with django_assert_num_queries(3):
+            response = anon_client.get(url)
+        assert response.status_code == 200
+        for review in response.json()['results']:
+            assert review['comment_count'] == review['id'] % 3
+
+        review = response.json()['results'][0]
+        response = anon_client.get(
+            f'/api/v1/titles/{title.pk}/reviews/{review["id"]}/'
+            '?expand=comment_count'
+        )
+        assert response.json()['comment_count'] == review['comment_count']
+
+    def test_unknown_expand(self, anon_client, reviewed):
+        title = reviewed.first()
+        response = anon_client.get(
+            f'/api/v1/titles/{title.pk}/reviews/?expand=latest_reviews'
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестное значение `expand` '
+            'возвращает статус 400'
+        )
+        assert 'expand' in response.json()
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def lines(self, client, url, params=None):
+        response = client.get(url, params or {})
+        assert response.status_code == 200
+        assert response.streaming, 'Проверьте, что выгрузка отдаётся потоком'
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    def test_ndjson_titles_and_reviews(self, admin_client, catalogue):
+        title, _ = catalogue(titles=3, reviews=5, comments=2)
+        titles = [json.loads(line) for line in self.lines(
+            admin_client, '/api/v1/export/titles/'
+        )]
+        assert [row['id'] for row in titles] == sorted(
+            row['id'] for row in titles
+        )
+        assert titles[0]['genre'] == ['comedy', 'drama']
+        assert titles[0]['category'] == 'film'
+        reviews = [json.loads(line) for line in self.lines(
+            admin_client, '/api/v1/export/reviews/'
+        )]
+        assert len(reviews) == 5
+        assert {row['title'] for row in reviews} == {title.pk}
+        comments = self.lines(
+            admin_client, '/api/v1/export/comments/', {'output': 'csv'}
+        )
+        assert comments[0] == 'id,review,title,author,text,pub_date'
+        assert len(comments) == 3
+
+    def test_incremental_watermark(self, admin_client, catalogue):
+        from reviews.models import Review
+
+        catalogue(titles=1, reviews=6, comments=0)
+        Review.objects.update(pub_date='2020-01-01T00:00:00Z')
+        first = [json.loads(line) for line in self.lines(
+            admin_client, '/api/v1/export/reviews/'
+        )]
+        last = first[2]
+        rest = [json.loads(line) for line in self.lines(
+            admin_client, '/api/v1/export/reviews/',
+            {'since': last['pub_date'], 'after_id': last['id']}
+        )]
+        assert [row['id'] for row in rest] == [
+            row['id'] for row in first[3:]
+        ], 'Проверьте, что выгрузка продолжается после водяного знака'
+
+    def test_admin_only_and_validation(self, client, admin_client):
+        assert client.get('/api/v1/export/titles/').status_code == 403
+        assert admin_client.get('/api/v1/export/users/').status_code == 404
+        assert admin_client.get(
+            '/api/v1/export/reviews/', {'since': 'вчера'}
+        ).status_code == 400
+
+    def test_command(self, catalogue, tmp_path):
+        from django.core.management import call_command
+
+        catalogue(titles=2, reviews=0, comments=0)
+        path = tmp_path / 'titles.ndjson'
+        call_command('export_data', 'titles', '--file', str(path))
+        assert len(path.read_text(encoding='utf-8').splitlines()) == 2
@@ -0,0 +1,53 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestFastSerializer:
+
+    def both(self, client, settings, url, params=None):
+        from django.core.cache import caches
+
+        contents = []
+        for enabled in (False, True):
+            settings.FAST_SERIALIZATION = enabled
+            for alias in settings.CACHES:
+                caches[alias].clear()
+            response = client.get(url, params or {})
+            assert response.status_code == 200
+            contents.append(response.content)
+        return contents
+
+    def test_titles_identical(self, admin_client, settings, catalogue):
+        from reviews.models import Title
+
+        title, _ = catalogue(titles=12, reviews=3, comments=0)
+        Title.objects.create(name='Без категории', year=1999)
+        regular, fast = self.both(admin_client, settings, '/api/v1/titles/')
+        assert regular == fast, (
+            'Проверьте, что быстрый путь отдаёт тот же JSON, что и DRF'
+        )
+        regular, fast = self.both(
+            admin_client, settings, '/api/v1/titles/', {'genre': 'drama'}
+        )
+        assert regular == fast
+
+    def test_reviews_and_comments_identical(self, admin_client, settings,
+                                            catalogue):
+        title, review = catalogue(titles=1, reviews=15, comments=15)
+        reviews_url = f'/api/v1/titles/{title.pk}/reviews/'
+        comments_url = f'{reviews_url}{review.pk}/comments/'
+        for url, params in (
+            (reviews_url, {}),
+            (reviews_url, {'pagination': 'cursor', 'limit': 5}),
+            (comments_url, {'page': 2}),
+        ):
+            regular, fast = self.both(admin_client, settings, url, params)
+            assert regular == fast, url
+
+    def test_fast_titles_queries(self, admin_client, settings, catalogue,
+                                 django_assert_max_num_queries):
+        settings.FAST_SERIALIZATION = True
+        catalogue(titles=10, reviews=0, comments=0)
+        admin_client.get('/api/v1/genres/')
+        with django_assert_max_num_queries(4):
+            admin_client.get('/api/v1/titles/')
@@ -0,0 +1,84 @@
+import pytest
+
+
+@pytest.fixture
+def titles():
+    from reviews.models import Category, Genre, Title
+
+    film = Category.objects.create(name='Фильм', slug='film')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    both = Title.objects.create(name='Оба', year=2000, category=film)
+    both.genre.set([drama, comedy])
+    Title.objects.create(
+        name='Драма', year=2001, category=book
+    ).genre.set([drama])
+    Title.objects.create(
+        name='Без жанра', year=2002, category=film
+    )
+
+
+@pytest.mark.django_db
+class TestTitleSlugFilters:
+
+    def names(self, client, params):
+        response = client.get('/api/v1/titles/', params)
+        assert response.status_code == 200
+        return sorted(item['name'] for item in response.json()['results'])
+
+    def test_multi_value_genre_without_duplicates(self, admin_client,
+                                                  titles):
+        assert self.names(admin_client, {'genre': 'drama,comedy'}) == [
+            'Драма', 'Оба'
+        ], 'Проверьте, что произведение с двумя жанрами не дублируется'
+
+    def test_exact_slug(self, admin_client, titles):
+        assert self.names(admin_client, {'genre': 'dram'}) == [], (
+            'Проверьте, что фильтр genre сравнивает слаг целиком'
+        )
+        assert self.names(admin_client, {'genre_contains': 'dram'}) == [
+            'Драма', 'Оба'
+        ]
+
+    def test_category_and_year(self, admin_client, titles):
+        assert self.names(
+            admin_client, {'category': 'film', 'year': 2000}
+        ) == ['Оба']
+        assert self.names(admin_client, {'category': 'film,book'}) == [
+            'Без жанра', 'Драма', 'Оба'
+        ]
+
+    def test_slug_ids_are_cached(self, admin_client, titles):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        params = {'genre': 'drama', 'category': 'book'}
+        admin_client.get('/api/v1/genres/')
+        with CaptureQueriesContext(connection) as first:
+            admin_client.get('/api/v1/titles/', params)
+        with CaptureQueriesContext(connection) as second:
+            admin_client.get('/api/v1/titles/', params)
+        assert len(second) == len(first) - 2, (
+            'Проверьте, что слаги жанров и категорий '
+            'разрешаются в id через кэш'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSlugCacheCommit:
+    """Слаг забывается только после коммита удаления."""
+
+    def test_slug_cache_is_shared(self, admin_client, titles, shared_cache):
+        from api.filters import slug_cache_key
+        from reviews.models import Genre
+
+        admin_client.get('/api/v1/titles/', {'genre': 'drama'})
+        key = slug_cache_key(Genre, 'drama')
+        assert shared_cache.get(key) is not None, (
+            'Проверьте, что слаги кэшируются в общем для воркеров кэше'
+        )
+        admin_client.delete('/api/v1/genres/drama/')
+        assert shared_cache.get(key) is None, (
+            'Проверьте, что удалённый слаг убирается из кэша'
+        )
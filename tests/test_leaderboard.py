@@ -0,0 +1,148 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestLeaderboard:
+
+    @pytest.fixture
+    def ranked(self, django_user_model, settings):
+        """
+        Три произведения: пять десяток, двадцать девяток
+        и двадцать пятёрок.
+        """
+        from django.core.management import call_command
+        from reviews.models import Category, Genre, Review, Title
+
+        settings.LEADERBOARD = {'MIN_REVIEWS': 3, 'PRIOR_WEIGHT': 10}
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        film = Category.objects.create(name='Фильм', slug='film')
+        users = [
+            django_user_model.objects.create(
+                username=f'user{number}', email=f'user{number}@yamdb.fake'
+            )
+            for number in range(20)
+        ]
+        titles = {}
+        for name, year, score, count in (('few', 2001, 10, 5),
+                                         ('many', 2002, 9, 20),
+                                         ('bad', 2002, 5, 20)):
+            title = Title.objects.create(name=name, year=year, category=film)
+            Review.objects.bulk_create(
+                Review(title=title, author=user, text='Отзыв', score=score)
+                for user in users[:count]
+            )
+            titles[name] = title
+        titles['many'].genre.add(drama)
+        titles['bad'].genre.add(drama)
+        Title.rebuild_ratings()
+        call_command('refresh_leaderboards')
+        return titles, users
+
+    def names(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+        )
+        return [entry['name'] for entry in response.json()['results']]
+
+    def test_bayesian_order(self, anon_client, ranked):
+        response = anon_client.get('/api/v1/leaderboards/')
+        results = response.json()['results']
+        assert [entry['name'] for entry in results] == [
+            'many', 'few', 'bad'
+        ], (
+            'Проверьте, что пять высших оценок не обгоняют '
+            'двадцать чуть более низких'
+        )
+        assert [entry['rank'] for entry in results] == [1, 2, 3]
+        prior = (5 * 10 + 20 * 9 + 20 * 5) / 45
+        assert results[0]['score'] == round(
+            (10 * prior + 20 * 9) / 30, 2
+        )
+        assert results[1]['rating'] == 10 and results[1]['reviews_count'] == 5
+
+        response = anon_client.get('/api/v1/leaderboards/?limit=1&offset=1')
+        assert [entry['rank'] for entry in response.json()['results']] == [2]
+
+    def test_scopes(self, anon_client, ranked):
+        assert self.names(
+            anon_client, '/api/v1/leaderboards/genres/drama/'
+        ) == ['many', 'bad']
+        assert self.names(
+            anon_client, '/api/v1/leaderboards/categories/film/'
+        ) == ['many', 'few', 'bad']
+        assert self.names(
+            anon_client, '/api/v1/leaderboards/years/2001/'
+        ) == ['few']
+        response = anon_client.get('/api/v1/leaderboards/genres/unknown/')
+        assert response.status_code == 404
+
+    def test_refresh_on_review_writes(self, anon_client, ranked):
+        from rest_framework.test import APIClient
+        from reviews.models import Review, Title
+
+        titles, users = ranked
+        newcomer = Title.objects.create(name='new', year=2003)
+        clients = []
+        for user in users[:3]:
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {user.token}')
+            response = client.post(
+                f'/api/v1/titles/{newcomer.id}/reviews/',
+                {'text': 'Отзыв', 'score': 10}
+            )
+            assert response.status_code == 201
+            clients.append((client, response.json()['id']))
+        assert 'new' in self.names(anon_client, '/api/v1/leaderboards/'), (
+            'Проверьте, что рейтинг обновляется при записи отзывов'
+        )
+
+        ranking = newcomer.ranking
+        score = ranking.score
+        client, review_id = clients[0]
+        client.patch(
+            f'/api/v1/titles/{newcomer.id}/reviews/{review_id}/', {'score': 1}
+        )
+        ranking.refresh_from_db()
+        assert ranking.reviews_count == 3 and ranking.score < score
+
+        client.delete(f'/api/v1/titles/{newcomer.id}/reviews/{review_id}/')
+        assert Review.objects.filter(title=newcomer).count() == 2
+        assert 'new' not in self.names(anon_client, '/api/v1/leaderboards/'), (
+            'Проверьте, что произведения с малым числом отзывов '
+            'выпадают из рейтинга'
+        )
+
+    def test_write_path_uses_stored_prior(self, ranked, shared_cache,
+                                          django_assert_num_queries):
+        from reviews import leaderboard
+        from reviews.models import RankingPrior
+
+        titles, _ = ranked
+        stored = RankingPrior.objects.get()
+        assert stored.mean == pytest.approx((50 + 180 + 100) / 45)
+        RankingPrior.objects.update(mean=1.0)
+        shared_cache.clear()
+        with django_assert_num_queries(1):
+            assert leaderboard.prior_mean() == 1.0, (
+                'Проверьте, что средняя оценка берётся из сохранённой '
+                'последним пересчётом, а не агрегатом по всем отзывам'
+            )
+        with django_assert_num_queries(0):
+            assert leaderboard.prior_mean() == 1.0
+
+    def test_titles_ordering(self, anon_client, ranked):
+        from reviews.models import Title
+
+        Title.objects.create(name='unrated', year=2000)
+        assert self.names(
+            anon_client, '/api/v1/titles/?ordering=-rating'
+        ) == ['few', 'many', 'bad', 'unrated'], (
+            'Проверьте, что произведения без рейтинга идут в конце'
+        )
+        assert self.names(
+            anon_client, '/api/v1/titles/?ordering=rating'
+        ) == ['bad', 'many', 'few', 'unrated']
+        assert self.names(
+            anon_client, '/api/v1/titles/?ordering=year,name'
+        ) == ['unrated', 'few', 'bad', 'many']
@@ -0,0 +1,98 @@
+import pytest
+
+FILES = {
+    'users.csv': (
+        'id,username,email,role,bio,first_name,last_name\n'
+        '100,reader,reader@yamdb.fake,user,,,\n'
+        '101,critic,critic@yamdb.fake,moderator,,,\n'
+    ),
+    'category.csv': 'id,name,slug\n1,Фильм,movie\n',
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n',
+    'titles.csv': (
+        'id,name,year,category\n'
+        '1,Побег из Шоушенка,1994,1\n'
+        '2,Крёстный отец,1972,\n'
+    ),
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n2,1,2\n3,2,1\n',
+    'review.csv': (
+        'id,title_id,text,author,score,pub_date\n'
+        '1,1,Отзыв,100,10,2019-09-24T21:08:21.567Z\n'
+        '2,1,"Отзыв\nв две строки",101,7,2019-09-25T21:08:21.567Z\n'
+    ),
+    'comments.csv': (
+        'id,review_id,text,author,pub_date\n'
+        '1,1,Комментарий,101,2020-01-13T23:20:02.422Z\n'
+    ),
+}
+
+
+@pytest.mark.django_db
+class TestLoadData:
+
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        for name, content in FILES.items():
+            (tmp_path / name).write_text(content, encoding='cp1251')
+        return tmp_path
+
+    def load(self, data_dir, *args):
+        from django.core.management import call_command
+
+        call_command('load_data', '--data-dir', str(data_dir),
+                     '--progress', '0', *args)
+
+    def test_load(self, data_dir):
+        from reviews.models import (Comment, Genre, Review, Title,
+                                    TitleScoreStats, User)
+
+        self.load(data_dir, '--batch-size', '1')
+        assert User.objects.count() == 2
+        assert Title.objects.count() == 2
+        assert Review.objects.count() == 2
+        assert Comment.objects.count() == 1
+        title = Title.objects.get(pk=1)
+        assert set(title.genre.values_list('slug', flat=True)) == {
+            'drama', 'comedy'
+        }, 'Проверьте, что загружаются связи произведений и жанров'
+        assert Genre.objects.get(slug='drama').title_set.count() == 2
+        assert title.name == 'Побег из Шоушенка'
+        assert Title.objects.get(pk=2).category is None
+        assert title.reviews_count == 2 and title.rating == pytest.approx(
+            8.5
+        ), 'Проверьте, что после загрузки отзывов пересчитан рейтинг'
+        assert TitleScoreStats.objects.get(title=title).score_10 == 1
+        review = Review.objects.get(pk=2)
+        assert review.text == 'Отзыв\nв две строки'
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что дата публикации берётся из файла'
+        )
+
+    def test_truncate(self, data_dir):
+        from reviews.models import Review, Title, User
+
+        self.load(data_dir)
+        (data_dir / 'review.csv').write_text(
+            'id,title_id,text,author,score,pub_date\n'
+            '1,2,Отзыв,100,4,2019-09-24T21:08:21.567Z\n',
+            encoding='cp1251'
+        )
+        (data_dir / 'comments.csv').write_text(
+            'id,review_id,text,author,pub_date\n', encoding='cp1251'
+        )
+        self.load(data_dir, '--truncate')
+        assert User.objects.count() == 2
+        assert Title.objects.count() == 2
+        assert Review.objects.count() == 1, (
+            'Проверьте, что --truncate очищает таблицы перед загрузкой'
+        )
+        first, second = Title.objects.order_by('pk')
+        assert first.reviews_count == 0 and first.rating is None
+        assert second.reviews_count == 1 and second.rating == 4
+        assert first.genre.count() == 2
+
+    def test_without_truncate_duplicates_fail(self, data_dir):
+        from django.db import IntegrityError
+
+        self.load(data_dir, '--models', 'category')
+        with pytest.raises(IntegrityError):
+            self.load(data_dir, '--models', 'category')
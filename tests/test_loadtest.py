@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+
+@pytest.mark.django_db
+class TestLoadTest:
+
+    def test_generate_and_run(self, tmp_path, django_user_model):
+        from auths.models import ConfirmationCode
+        from django.core.management import call_command
+        from reviews.models import Review, Title, TitleScoreStats
+
+        call_command(
+            'generate_dataset', '--users', 20, '--titles', 30,
+            '--reviews', 200, '--comments', 50, '--genres', 4
+        )
+        counts = list(Title.objects.order_by(
+            '-reviews_count'
+        ).values_list('reviews_count', flat=True))
+        assert counts[0] == 20, (
+            'Проверьте, что отзывы распределены по Ципфу с потолком '
+            'по числу пользователей'
+        )
+        assert sum(counts) == Review.objects.count()
+        assert TitleScoreStats.objects.exists()
+
+        real = django_user_model.objects.create(
+            username='loader', email='loader@example.com'
+        )
+        reviews, ratings = Review.objects.count(), list(
+            Title.objects.order_by('id').values_list('reviews_count',
+                                                     'score_sum')
+        )
+        output = tmp_path / 'report.json'
+        call_command('run_loadtest', '--requests', 5, '--output', str(output))
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert set(report['scenarios']) == {
+            'titles_filtered', 'reviews_page', 'token', 'review_create'
+        }
+        for name, scenario in report['scenarios'].items():
+            assert scenario['errors'] == 0, name
+            assert {'p50', 'p95', 'p99', 'throughput_rps',
+                    'queries_mean'} <= set(scenario)
+        assert Review.objects.count() == reviews and list(
+            Title.objects.order_by('id').values_list('reviews_count',
+                                                     'score_sum')
+        ) == ratings, 'Проверьте, что прогон удаляет созданные им отзывы'
+        assert not ConfirmationCode.objects.exists(), (
+            'Проверьте, что коды выпускаются только синтетическим '
+            'пользователям и удаляются после прогона'
+        )
+        assert not ConfirmationCode.objects.filter(user=real).exists()
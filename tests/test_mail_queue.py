@@ -0,0 +1,129 @@
+import pytest
+
+
+class BrokenConnection:
+
+    def open(self):
+        return True
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class UnreachableConnection(BrokenConnection):
+
+    def open(self):
+        raise ConnectionRefusedError('SMTP не отвечает')
+
+
+@pytest.mark.django_db
+class TestMailQueue:
+
+    def test_signup_only_enqueues(self, anon_client, mailoutbox):
+        from auths.models import OutboundEmail
+
+        response = anon_client.post(
+            '/api/v1/auth/signup/',
+            {'username': 'newbie', 'email': 'newbie@yamdb.fake'}
+        )
+        assert response.status_code == 200
+        assert mailoutbox == [], (
+            'Проверьте, что регистрация не отправляет письмо в запросе'
+        )
+        email = OutboundEmail.objects.get()
+        assert email.recipient == 'newbie@yamdb.fake'
+        assert email.status == OutboundEmail.PENDING
+
+    def test_worker_sends_batch(self, mailoutbox):
+        from auths.mail import enqueue_mail, send_batch
+        from auths.models import OutboundEmail
+
+        for number in range(3):
+            enqueue_mail('code', str(number), f'user{number}@yamdb.fake')
+        assert send_batch() == (3, 0)
+        assert len(mailoutbox) == 3
+        assert not OutboundEmail.objects.exclude(
+            status=OutboundEmail.SENT
+        ).exists()
+        assert not OutboundEmail.objects.exclude(body='').exists(), (
+            'Проверьте, что после отправки текст с кодом стирается'
+        )
+
+    def test_retry_and_dead_letter(self, settings):
+        from auths.mail import enqueue_mail, send_batch
+        from auths.models import OutboundEmail
+
+        settings.MAIL_QUEUE = {'MAX_ATTEMPTS': 2, 'RETRY_DELAY': 0}
+        email = enqueue_mail('code', '123', 'user@yamdb.fake')
+        assert send_batch(connection=BrokenConnection()) == (0, 1)
+        email.refresh_from_db()
+        assert email.status == OutboundEmail.PENDING
+        assert email.attempts == 1 and 'SMTP' in email.last_error
+        send_batch(connection=BrokenConnection())
+        email.refresh_from_db()
+        assert email.status == OutboundEmail.DEAD, (
+            'Проверьте, что после MAX_ATTEMPTS письмо уходит в dead'
+        )
+        assert email.body == '123', (
+            'Проверьте, что текст dead-письма сохраняется для разбора'
+        )
+
+    def test_unreachable_server_postpones_batch(self, settings):
+        from auths.mail import enqueue_mail, send_batch
+        from auths.models import OutboundEmail
+
+        settings.MAIL_QUEUE = {'RETRY_DELAY': 60}
+        for number in range(2):
+            enqueue_mail('code', str(number), f'user{number}@yamdb.fake')
+        assert send_batch(connection=UnreachableConnection()) == (0, 2), (
+            'Проверьте, что ошибка соединения не прерывает разбор очереди'
+        )
+        for email in OutboundEmail.objects.all():
+            assert email.status == OutboundEmail.PENDING
+            assert email.attempts == 1
+            assert 'ConnectionRefusedError' in email.last_error
+            assert email.next_attempt_at > email.created
+        assert send_batch(connection=UnreachableConnection()) == (0, 0)
+
+    def test_purge_sent(self, mailoutbox):
+        from datetime import timedelta
+
+        from auths.mail import enqueue_mail, purge_sent, send_batch
+        from auths.models import OutboundEmail
+        from django.utils import timezone
+
+        enqueue_mail('code', '1', 'old@yamdb.fake')
+        enqueue_mail('code', '2', 'new@yamdb.fake')
+        send_batch()
+        OutboundEmail.objects.filter(recipient='old@yamdb.fake').update(
+            sent_at=timezone.now() - timedelta(days=30)
+        )
+        enqueue_mail('code', '3', 'pending@yamdb.fake')
+        assert purge_sent(7) == 1
+        assert set(
+            OutboundEmail.objects.values_list('recipient', flat=True)
+        ) == {'new@yamdb.fake', 'pending@yamdb.fake'}
+
+    def test_purge_dead(self, settings):
+        from datetime import timedelta
+
+        from auths.mail import enqueue_mail, purge_dead, send_batch
+        from auths.models import OutboundEmail
+        from django.utils import timezone
+
+        settings.MAIL_QUEUE = {'MAX_ATTEMPTS': 1}
+        enqueue_mail('code', '1', 'old@yamdb.fake')
+        enqueue_mail('code', '2', 'new@yamdb.fake')
+        send_batch(connection=BrokenConnection())
+        OutboundEmail.objects.filter(recipient='old@yamdb.fake').update(
+            created=timezone.now() - timedelta(days=2)
+        )
+        assert purge_dead() == 1, (
+            'Проверьте, что dead-письма старше KEEP_DEAD удаляются'
+        )
+        assert list(
+            OutboundEmail.objects.values_list('recipient', flat=True)
+        ) == ['new@yamdb.fake']
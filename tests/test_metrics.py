@@ -0,0 +1,67 @@
+import pytest
+
+
+@pytest.fixture
+def registry():
+    from api_yamdb.metrics import registry
+
+    registry.reset()
+    return registry
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def metrics(self, client):
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        return response.content.decode()
+
+    def test_view_metrics(self, admin_client, anon_client, registry,
+                          catalogue):
+        catalogue(titles=3, reviews=0, comments=0)
+        admin_client.get('/api/v1/titles/')
+        anon_client.get('/api/v1/genres/')
+        text = self.metrics(anon_client)
+        assert 'yamdb_requests_total{status="200",view="TitleViewSet.list"}' \
+            ' 1' in text, 'Проверьте, что запросы считаются по вьюхам'
+        assert 'yamdb_request_duration_seconds_count{view="TitleViewSet.list"}' \
+            ' 1' in text
+        assert 'yamdb_db_queries_total{view="TitleViewSet.list"}' in text
+        assert 'yamdb_response_bytes_total{view="TitleViewSet.list"}' in text
+        assert (
+            'yamdb_section_duration_seconds_count'
+            '{section="JWTAuthentication.authenticate"}'
+        ) in text
+        assert 'yamdb_response_cache_misses_total{scope="genres"} 1' in text
+        assert '# TYPE yamdb_requests_total counter' in text
+        assert '# HELP yamdb_request_duration_seconds ' in text
+        assert '# TYPE yamdb_request_duration_seconds histogram' in text, (
+            'Проверьте, что у семейств метрик есть строки TYPE и HELP'
+        )
+        assert text.count('# TYPE yamdb_requests_total ') == 1
+
+    def test_sampling_and_token(self, anon_client, registry, settings):
+        settings.METRICS = {'SAMPLE_RATE': 0, 'TOKEN': 'secret'}
+        anon_client.get('/api/v1/genres/')
+        assert anon_client.get('/metrics').status_code == 403
+        text = anon_client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer secret'
+        ).content.decode()
+        assert 'yamdb_requests_total{status="200",view="GenreViewSet.list"}' \
+            in text
+        assert 'yamdb_request_duration_seconds' not in text, (
+            'Проверьте, что без выборки подробные метрики не пишутся'
+        )
+
+    def test_restricted_by_address(self, anon_client, registry, settings):
+        settings.METRICS = {'ALLOWED_IPS': ['10.0.0.0/8']}
+        assert anon_client.get('/metrics').status_code == 403, (
+            'Проверьте, что без токена метрики доступны только '
+            'с адресов ALLOWED_IPS'
+        )
+        response = anon_client.get('/metrics', REMOTE_ADDR='10.1.2.3')
+        assert response.status_code == 200
+        settings.METRICS = {'ALLOWED_IPS': [], 'PUBLIC': True}
+        assert anon_client.get('/metrics').status_code == 200
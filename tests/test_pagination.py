@@ -0,0 +1,54 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def walk(self, client, url):
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+            )
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что курсорный режим не считает COUNT(*)'
+            )
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+        return ids
+
+    def test_reviews_cursor_walk(self, anon_client, catalogue):
+        title, _ = catalogue(titles=1, reviews=25, comments=1)
+        ids = self.walk(
+            anon_client,
+            f'/api/v1/titles/{title.id}/reviews/?pagination=cursor&limit=10'
+        )
+        expected = list(
+            title.reviews.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация отдаёт все отзывы '
+            'без повторов в порядке (-pub_date, -id)'
+        )
+
+    def test_comments_cursor_walk(self, anon_client, catalogue):
+        title, review = catalogue(titles=1, reviews=1, comments=15)
+        ids = self.walk(
+            anon_client,
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            '?pagination=cursor'
+        )
+        assert len(ids) == len(set(ids)) == 15
+
+    def test_offset_mode_is_default(self, anon_client, catalogue):
+        title, _ = catalogue(titles=1, reviews=3, comments=1)
+        response = anon_client.get(
+            f'/api/v1/titles/{title.id}/reviews/?limit=2&offset=1'
+        )
+        data = response.json()
+        assert data['count'] == 3 and len(data['results']) == 2, (
+            'Проверьте, что limit/offset-пагинация отзывов сохранилась'
+        )
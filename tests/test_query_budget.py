@@ -0,0 +1,116 @@
+import pytest
+
+QUERY_BUDGET = {
+    'titles-list': 4,
+    'titles-detail': 3,
+    'reviews-list': 3,
+    'comments-list': 3,
+    'genres-list': 3,
+    'categories-list': 3,
+    'users-list': 3,
+}
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    def count_queries(self, client, url, django_assert_max_num_queries,
+                      budget):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with django_assert_max_num_queries(budget):
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+        )
+        return len(context)
+
+    @pytest.mark.parametrize('size', [1, 10])
+    def test_titles_list(self, anon_client, catalogue, size,
+                         django_assert_max_num_queries):
+        catalogue(titles=size, reviews=1, comments=1)
+        queries = self.count_queries(
+            anon_client, '/api/v1/titles/', django_assert_max_num_queries,
+            QUERY_BUDGET['titles-list']
+        )
+        assert queries == QUERY_BUDGET['titles-list'], (
+            'Проверьте, что число запросов к `/api/v1/titles/` '
+            'не зависит от количества произведений на странице'
+        )
+
+    def test_title_detail(self, anon_client, catalogue,
+                          django_assert_max_num_queries):
+        title, _ = catalogue(titles=1, reviews=1, comments=1)
+        self.count_queries(
+            anon_client, f'/api/v1/titles/{title.id}/',
+            django_assert_max_num_queries, QUERY_BUDGET['titles-detail']
+        )
+
+    @pytest.mark.parametrize('size', [1, 10])
+    def test_reviews_list(self, anon_client, catalogue, size,
+                          django_assert_max_num_queries):
+        title, _ = catalogue(titles=1, reviews=size, comments=1)
+        self.count_queries(
+            anon_client, f'/api/v1/titles/{title.id}/reviews/',
+            django_assert_max_num_queries, QUERY_BUDGET['reviews-list']
+        )
+
+    @pytest.mark.parametrize('size', [1, 10])
+    def test_comments_list(self, anon_client, catalogue, size,
+                           django_assert_max_num_queries):
+        title, review = catalogue(titles=1, reviews=1, comments=size)
+        self.count_queries(
+            anon_client,
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+            django_assert_max_num_queries, QUERY_BUDGET['comments-list']
+        )
+
+    @pytest.mark.parametrize('endpoint', ['genres', 'categories'])
+    def test_slug_lists(self, anon_client, catalogue, endpoint,
+                        django_assert_max_num_queries):
+        catalogue(titles=1, reviews=1, comments=1)
+        self.count_queries(
+            anon_client, f'/api/v1/{endpoint}/',
+            django_assert_max_num_queries, QUERY_BUDGET[f'{endpoint}-list']
+        )
+
+    def test_users_list(self, admin_client, catalogue,
+                        django_assert_max_num_queries):
+        catalogue(titles=1, reviews=10, comments=1)
+        self.count_queries(
+            admin_client, '/api/v1/users/',
+            django_assert_max_num_queries, QUERY_BUDGET['users-list']
+        )
+
+    def test_review_create_fetches_title_once(self, user, catalogue):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from rest_framework.test import APIClient
+
+        title, _ = catalogue(titles=1, reviews=1, comments=1)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {user.token}')
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(url, {'text': 'Отзыв', 'score': 7},
+                                   format='json')
+        assert response.status_code == 201
+        title_lookups = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT "reviews_title"."id", '
+                                       '"reviews_title"."name"')
+        ]
+        assert len(title_lookups) == 1, (
+            'Проверьте, что при создании отзыва произведение '
+            'запрашивается из базы один раз'
+        )
+
+        response = client.post(url, {'text': 'Ещё отзыв', 'score': 3},
+                               format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв на произведение '
+            'возвращает статус 400'
+        )
+        assert 'non_field_errors' in response.json()
@@ -0,0 +1,66 @@
+import pytest
+
+
+def test_fingerprint():
+    from api_yamdb.querydetector import fingerprint
+
+    assert fingerprint(
+        'SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = \'x\''
+    ) == fingerprint('SELECT *  FROM t WHERE id IN (%s) AND name = \'yy\'')
+    assert fingerprint('SELECT 1 LIMIT 21') == 'SELECT ? LIMIT ?'
+
+
+@pytest.mark.django_db
+class TestQueryDetector:
+
+    def test_detects_n_plus_one_with_field(self, catalogue):
+        from api.serializers import GetTitleSerializer
+        from api_yamdb.querydetector import QueryDetector
+        from reviews.models import Title
+
+        catalogue(titles=4, reviews=0, comments=0)
+        with QueryDetector() as detector:
+            GetTitleSerializer(Title.objects.all(), many=True).data
+        fields = {
+            field for issue in detector.repeated() for field in issue['fields']
+        }
+        assert {'GetTitleSerializer.category',
+                'GetTitleSerializer.genre'} <= fields, (
+            'Проверьте, что детектор находит N+1 и поле сериализатора'
+        )
+
+    @pytest.mark.parametrize('fast', [True, False])
+    def test_list_endpoints_are_clean(self, admin_client, catalogue,
+                                      query_detector, settings, fast):
+        settings.FAST_SERIALIZATION = fast
+        title, review = catalogue(titles=10, reviews=10, comments=10)
+        reviews_url = f'/api/v1/titles/{title.pk}/reviews/'
+        with query_detector():
+            admin_client.get('/api/v1/titles/')
+            admin_client.get(reviews_url)
+            admin_client.get(f'{reviews_url}{review.pk}/comments/')
+
+    def test_middleware_outputs(self, anon_client, settings, tmp_path,
+                                monkeypatch):
+        from api.views import GenreViewSet
+        from reviews.models import Genre
+
+        for number in range(3):
+            Genre.objects.create(name=str(number), slug=f'g{number}')
+
+        def list_with_n_plus_one(self, request, *args, **kwargs):
+            for genre in Genre.objects.only('id'):
+                Genre.objects.get(pk=genre.pk)
+            return original(self, request, *args, **kwargs)
+
+        original = GenreViewSet.list
+        monkeypatch.setattr(GenreViewSet, 'list', list_with_n_plus_one)
+        settings.QUERY_DETECTOR = {
+            'ENABLED': True, 'OUTPUTS': ['header', 'file'],
+            'REPORT_DIR': str(tmp_path),
+        }
+        response = anon_client.get('/api/v1/genres/')
+        assert response['X-Query-Issues'] == 'n+1=1; slow=0'
+        reports = list(tmp_path.iterdir())
+        assert len(reports) == 1
+        assert 'GenreViewSet.list' in reports[0].name
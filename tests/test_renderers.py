@@ -0,0 +1,61 @@
+import pytest
+
+
+class TestFastJSONRenderer:
+
+    def test_same_bytes_as_drf(self):
+        from datetime import datetime, timezone
+        from decimal import Decimal
+
+        from api.renderers import FastJSONRenderer
+        from rest_framework.renderers import JSONRenderer
+
+        data = {
+            'text': 'Отзыв с разделителем',
+            'pub_date': datetime(2020, 1, 2, 3, 4, 5, 678901,
+                                 tzinfo=timezone.utc),
+            'score': Decimal('7.50'),
+            'rating': 7.25,
+            'items': [1, None, True],
+            1: 'ключ-число',
+        }
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(
+            data
+        ), 'Проверьте, что FastJSONRenderer кодирует как JSONRenderer DRF'
+        assert FastJSONRenderer().render(
+            data, 'application/json; indent=4'
+        ) == JSONRenderer().render(data, 'application/json; indent=4')
+
+    def test_parser(self):
+        from io import BytesIO
+
+        from api.renderers import FastJSONParser
+        from rest_framework.exceptions import ParseError
+
+        parser = FastJSONParser()
+        assert parser.parse(BytesIO('{"a": ["б"]}'.encode())) == {
+            'a': ['б']
+        }
+        with pytest.raises(ParseError):
+            parser.parse(BytesIO(b'{"a": NaN}'))
+
+
+@pytest.mark.django_db
+class TestStreamingList:
+
+    def test_streamed_page_matches_regular(self, admin_client, settings,
+                                           catalogue):
+        title, _ = catalogue(titles=1, reviews=7, comments=0)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        settings.FAST_SERIALIZATION = True
+        regular = admin_client.get(url, {'limit': 7})
+        settings.JSON_RENDERER = {'STREAM_MIN_ITEMS': 5,
+                                  'STREAM_CHUNK_SIZE': 3}
+        streamed = admin_client.get(url, {'limit': 7})
+        assert streamed.streaming, (
+            'Проверьте, что большие страницы отдаются потоком'
+        )
+        assert b''.join(streamed.streaming_content) == regular.content
+        assert streamed['Content-Type'] == 'application/json'
+        small = admin_client.get(url, {'limit': 4})
+        assert not small.streaming
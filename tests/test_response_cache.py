@@ -0,0 +1,54 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_anonymous_hit(self, anon_client, catalogue,
+                           django_assert_max_num_queries):
+        catalogue(titles=3, reviews=1, comments=1)
+        url = '/api/v1/titles/?year=2001&genre=drama'
+        first = anon_client.get(url)
+        assert first['X-Cache'] == 'MISS'
+        with django_assert_max_num_queries(1):
+            second = anon_client.get('/api/v1/titles/?genre=drama&year=2001')
+        assert second['X-Cache'] == 'HIT', (
+            'Проверьте, что порядок параметров не влияет на ключ кэша'
+        )
+        assert second.content == first.content
+
+    def test_write_invalidates(self, admin_client, anon_client, catalogue):
+        title, _ = catalogue(titles=1, reviews=1, comments=1)
+        url = f'/api/v1/titles/{title.id}/'
+        anon_client.get(url)
+        response = admin_client.patch(url, {'name': 'Новое имя'})
+        assert response.status_code == 200
+        response = anon_client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что изменение произведения сбрасывает кэш'
+        )
+        assert response.json()['name'] == 'Новое имя'
+
+    def test_authenticated_bypass_and_stats(self, admin_client, anon_client):
+        from api_yamdb.metrics import registry
+
+        registry.reset()
+        anon_client.get('/api/v1/genres/')
+        anon_client.get('/api/v1/genres/')
+        response = admin_client.get('/api/v1/genres/')
+        assert not response.has_header('X-Cache')
+        stats = admin_client.get('/api/v1/cache/stats/').json()
+        assert stats['genres'] == {'hits': 1, 'misses': 1}, (
+            'Проверьте счётчики попаданий и промахов кэша'
+        )
+
+    def test_key_includes_host(self, anon_client):
+        response = anon_client.get('/api/v1/genres/', HTTP_HOST='a.example')
+        assert response['X-Cache'] == 'MISS'
+        response = anon_client.get('/api/v1/genres/', HTTP_HOST='b.example')
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что хост входит в ключ кэша: в ответе '
+            'абсолютные ссылки'
+        )
+        response = anon_client.get('/api/v1/genres/', HTTP_HOST='a.example')
+        assert response['X-Cache'] == 'HIT'
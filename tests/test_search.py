@@ -0,0 +1,69 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Category, Title
+
+        film = Category.objects.create(name='Фильм', slug='film')
+        book = Category.objects.create(name='Книга', slug='book')
+        return {
+            'godfather': Title.objects.create(
+                name='Крёстный отец', year=1972, category=film,
+                description='Сага о семье Корлеоне'
+            ),
+            'family': Title.objects.create(
+                name='Семейка Аддамс', year=1991, category=film
+            ),
+            'novel': Title.objects.create(
+                name='Отцы и дети', year=1862, category=book,
+                description='Роман о семье Кирсановых'
+            ),
+            **{
+                f'other{number}': Title.objects.create(
+                    name=f'Сборник {number}', year=2000, category=book,
+                    description='Рассказы разных лет'
+                )
+                for number in range(5)
+            },
+        }
+
+    def search(self, client, query):
+        response = client.get('/api/v1/titles/', {'search': query})
+        assert response.status_code == 200
+        return [item['name'] for item in response.json()['results']]
+
+    def test_ranked_prefix_search(self, admin_client, titles):
+        names = self.search(admin_client, 'сем')
+        assert names[0] == 'Семейка Аддамс', (
+            'Проверьте, что совпадение в названии ранжируется выше, '
+            'чем совпадение в описании'
+        )
+        assert set(names) == {
+            'Семейка Аддамс', 'Крёстный отец', 'Отцы и дети'
+        }
+
+    def test_all_terms_required(self, admin_client, titles):
+        assert self.search(admin_client, 'отец сага') == ['Крёстный отец']
+
+    def test_combined_with_filters(self, admin_client, titles):
+        response = admin_client.get(
+            '/api/v1/titles/', {'search': 'семье', 'category': 'book'}
+        )
+        names = [item['name'] for item in response.json()['results']]
+        assert names == ['Отцы и дети'], (
+            'Проверьте, что поиск сочетается с фильтрами'
+        )
+
+    def test_index_follows_updates(self, admin_client, titles):
+        title = titles['family']
+        title.name = 'Бриллиантовая рука'
+        title.save()
+        assert self.search(admin_client, 'бриллиант') == [
+            'Бриллиантовая рука'
+        ]
+        title.delete()
+        assert self.search(admin_client, 'бриллиант') == []
@@ -0,0 +1,106 @@
+import pytest
+
+
+def capture(client, url):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+    )
+    return response.json(), ' '.join(
+        query['sql'] for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    @pytest.mark.parametrize('fast', [True, False])
+    def test_titles(self, anon_client, catalogue, settings, fast):
+        settings.FAST_SERIALIZATION = fast
+        catalogue(titles=3, reviews=1, comments=1)
+        data, sql = capture(anon_client, '/api/v1/titles/?fields=name,year')
+        for title in data['results']:
+            assert set(title) == {'name', 'year'}, (
+                'Проверьте, что `?fields=` оставляет в ответе '
+                'только перечисленные поля'
+            )
+        assert 'reviews_genre' not in sql, (
+            'Проверьте, что без поля genre жанры не запрашиваются'
+        )
+        assert 'description' not in sql
+        assert 'reviews_category' not in sql
+
+    @pytest.mark.parametrize(
+        'fields', ['id,genre', 'category,rating', 'description']
+    )
+    def test_titles_fast_matches_regular(self, anon_client, catalogue,
+                                         settings, fields):
+        catalogue(titles=3, reviews=1, comments=1)
+        url = f'/api/v1/titles/?fields={fields}'
+        settings.FAST_SERIALIZATION = True
+        fast, _ = capture(anon_client, url)
+        settings.FAST_SERIALIZATION = False
+        regular, _ = capture(anon_client, url)
+        assert fast == regular
+
+    def test_titles_with_expand(self, anon_client, catalogue):
+        catalogue(titles=1, reviews=2, comments=1)
+        data, _ = capture(
+            anon_client, '/api/v1/titles/?fields=name&expand=latest_reviews'
+        )
+        title = data['results'][0]
+        assert set(title) == {'name', 'latest_reviews'}
+        assert set(title['latest_reviews'][0]) == {
+            'id', 'text', 'author', 'score', 'pub_date'
+        }, 'Проверьте, что `?fields=` не урезает вложенные отзывы'
+
+    @pytest.mark.parametrize('fast', [True, False])
+    def test_reviews_and_comments(self, anon_client, catalogue, settings,
+                                  fast):
+        settings.FAST_SERIALIZATION = fast
+        title, review = catalogue(titles=1, reviews=3, comments=3)
+        data, sql = capture(
+            anon_client, f'/api/v1/titles/{title.id}/reviews/?fields=id,score'
+        )
+        assert all(set(item) == {'id', 'score'} for item in data['results'])
+        assert '"text"' not in sql
+        assert 'auth_user' not in sql
+
+        data, sql = capture(
+            anon_client,
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            '?fields=author'
+        )
+        assert [set(item) for item in data['results']] == [{'author'}] * 3
+        assert '"reviews_comment"."text"' not in sql
+
+    def test_reviews_cursor_pagination(self, anon_client, catalogue,
+                                       django_assert_max_num_queries):
+        title, _ = catalogue(titles=1, reviews=5, comments=1)
+        with django_assert_max_num_queries(3):
+            response = anon_client.get(
+                f'/api/v1/titles/{title.id}/reviews/'
+                '?fields=id&pagination=cursor&limit=2'
+            )
+        assert response.json()['next']
+
+    def test_users(self, admin_client, catalogue):
+        catalogue(titles=1, reviews=3, comments=1)
+        data, sql = capture(admin_client, '/api/v1/users/?fields=username')
+        assert all(set(user) == {'username'} for user in data['results'])
+        assert '"bio"' not in sql.split('"__count"', 1)[-1], (
+            'Проверьте, что `?fields=` сужает список колонок в SQL'
+        )
+
+    def test_unknown_field(self, anon_client, catalogue):
+        catalogue(titles=1, reviews=1, comments=1)
+        response = anon_client.get('/api/v1/titles/?fields=name,secret')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестное поле в `?fields=` '
+            'возвращает статус 400'
+        )
+        assert 'fields' in response.json()
@@ -0,0 +1,130 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def post_review(self, user, title, score):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {user.token}')
+        response = client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            {'text': 'Отзыв', 'score': score}
+        )
+        assert response.status_code == 201
+        return client, response.json()['id']
+
+    def test_stats_follow_review_writes(self, anon_client,
+                                        django_user_model,
+                                        django_assert_max_num_queries):
+        from reviews.models import Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        users = [
+            django_user_model.objects.create(
+                username=f'user{number}', email=f'user{number}@yamdb.fake'
+            )
+            for number in range(4)
+        ]
+        clients = [
+            self.post_review(user, title, score)
+            for user, score in zip(users, (2, 4, 4, 9))
+        ]
+        client, review_id = clients[-1]
+        client.patch(
+            f'/api/v1/titles/{title.id}/reviews/{review_id}/', {'score': 10}
+        )
+        client, review_id = clients[0]
+        client.delete(f'/api/v1/titles/{title.id}/reviews/{review_id}/')
+        with django_assert_max_num_queries(1):
+            response = anon_client.get(f'/api/v1/titles/{title.id}/stats/')
+        data = response.json()
+        assert data['count'] == 3 and data['mean'] == pytest.approx(6), (
+            'Проверьте, что статистика обновляется при записи отзывов'
+        )
+        assert data['median'] == 4
+        assert data['histogram']['4'] == 2 and data['histogram']['10'] == 1
+        assert data['histogram']['2'] == 0 and data['histogram']['9'] == 0
+
+    def test_bulk_stats(self, anon_client, catalogue):
+        from django.core.management import call_command
+        from reviews.models import Title
+
+        title, _ = catalogue(titles=2, reviews=4, comments=1)
+        call_command('rebuild_ratings')
+        empty = Title.objects.exclude(pk=title.pk).get()
+        response = anon_client.get(
+            '/api/v1/titles/stats/', {'ids': f'{title.id},{empty.id},999'}
+        )
+        assert response.status_code == 200
+        data = {item['title']: item for item in response.json()}
+        assert set(data) == {title.id, empty.id}, (
+            'Проверьте, что несуществующие произведения пропускаются'
+        )
+        assert data[title.id]['count'] == 4, (
+            'Проверьте, что rebuild_ratings пересчитывает статистику'
+        )
+        assert data[empty.id]['count'] == 0
+        assert data[empty.id]['median'] is None
+
+    def test_missing_title(self, anon_client):
+        response = anon_client.get('/api/v1/titles/999/stats/')
+        assert response.status_code == 404
+
+    def test_bookkeeping_outside_api(self, anon_client, django_user_model,
+                                     settings):
+        from reviews.models import Review, Title, TitleRanking
+
+        settings.LEADERBOARD = {'MIN_REVIEWS': 2, 'PRIOR_WEIGHT': 1}
+        title = Title.objects.create(name='Произведение', year=2000)
+        users = [
+            django_user_model.objects.create(
+                username=f'user{number}', email=f'user{number}@yamdb.fake'
+            )
+            for number in range(3)
+        ]
+        reviews = [
+            Review.objects.create(title=title, author=user, text='Отзыв',
+                                  score=score)
+            for user, score in zip(users, (2, 4, 9))
+        ]
+        title.refresh_from_db()
+        assert (title.reviews_count, title.score_sum) == (3, 15), (
+            'Проверьте, что создание отзыва учитывается в рейтинге'
+        )
+        reviews[0].score = 8
+        reviews[0].save()
+        title.refresh_from_db()
+        assert title.score_sum == 21 and title.rating == pytest.approx(7), (
+            'Проверьте, что изменение оценки учитывается в рейтинге'
+        )
+        reviews[1].delete()
+        users[2].delete()
+        title.refresh_from_db()
+        assert (title.reviews_count, title.score_sum) == (1, 8), (
+            'Проверьте, что удаление автора исключает его отзывы '
+            'из рейтинга'
+        )
+        assert title.rating == pytest.approx(8)
+        assert title.score_stats.reviews_count == 1
+        assert title.score_stats.score_8 == 1
+        assert title.score_stats.score_9 == 0
+        assert not TitleRanking.objects.filter(title=title).exists(), (
+            'Проверьте, что произведение с малым числом отзывов '
+            'уходит из рейтинга лучших'
+        )
+
+    def test_title_delete_cascade(self, django_user_model):
+        from reviews.models import Review, Title, TitleScoreStats
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        user = django_user_model.objects.create(
+            username='user', email='user@yamdb.fake'
+        )
+        Review.objects.create(title=title, author=user, text='Отзыв',
+                              score=5)
+        title.delete()
+        assert not TitleScoreStats.objects.exists()
+        assert not Review.objects.exists()